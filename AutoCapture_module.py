@@ -0,0 +1,165 @@
+import os
+import sys
+import cv2
+import numpy as np
+from CameraPreview_module import PREVIEW_FPS, PREVIEW_SIZE, open_frame_source
+
+# --- Setup ---
+# Motion and sharpness are measured on a small greyscale copy of the preview
+ANALYSIS_SIZE = (320, 240)
+# Mean grey-level change (0-255) between analysed frames, or against the last
+# captured page, that counts as a page turn
+MOTION_THRESHOLD = 6.0
+# Below this change from the previous frame the page is holding still
+STILL_THRESHOLD = 1.5
+# Still frames to watch before capturing; the sharpest of them is saved
+SETTLE_FRAMES = 6
+# Page signatures for duplicate checks: small, brightness-normalised thumbnails
+SIGNATURE_SIZE = (64, 48)
+# Correlation with an earlier capture's signature above which a page is a likely duplicate
+DUPLICATE_CORRELATION = 0.9
+
+
+def sharpness(gray: np.ndarray) -> float:
+    """Variance of the Laplacian: high for crisp text, low for motion or focus blur."""
+    return float(cv2.Laplacian(gray, cv2.CV_32F).var())
+
+
+def page_signature(gray: np.ndarray) -> np.ndarray:
+    signature = cv2.resize(gray, SIGNATURE_SIZE, interpolation=cv2.INTER_AREA).astype(np.float32)
+    signature -= signature.mean()
+    norm = np.linalg.norm(signature)
+    return signature / norm if norm else signature
+
+
+class PageTurnDetector:
+    """
+    Watches preview frames for a page turn (motion), waits for the page to
+    hold still, then hands back the sharpest full-resolution frame of the
+    still window. feed() is cheap enough to run on every previewed frame.
+
+    States: "settling" (collecting still frames), "waiting" (page captured,
+    watching for the next turn) and "moving" (a turn is under way).
+    """
+
+    def __init__(self, settle_frames: int = SETTLE_FRAMES):
+        self.settle_frames = settle_frames
+        self.state = "settling"  # the first page is captured once it holds still
+        self.signatures = []  # one per capture, for duplicate checks
+
+        self._gray = np.empty((ANALYSIS_SIZE[1], ANALYSIS_SIZE[0]), np.uint8)
+        self._prev = np.empty_like(self._gray)
+        self._page = None  # analysis frame of the last capture
+        self._has_prev = False
+        self._still = 0
+        self._best = None  # full-resolution copy of the sharpest still frame
+        self._best_gray = np.empty_like(self._gray)
+        self._best_sharpness = -1.0
+        self._best_at = 0.0
+
+    def feed(self, frame: np.ndarray, small: np.ndarray, captured_at: float = 0.0) -> dict | None:
+        """
+        Analyse one frame (full resolution and its preview-sized copy, BGR).
+        Returns a capture {"frame", "sharpness", "captured_at", "index",
+        "duplicate_of"} when a page has settled, else None. duplicate_of is
+        the index of an earlier capture this page looks like, or None.
+        """
+        gray_small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        cv2.resize(gray_small, ANALYSIS_SIZE, dst=self._gray, interpolation=cv2.INTER_AREA)
+        change = cv2.norm(self._gray, self._prev, cv2.NORM_L1) / self._gray.size if self._has_prev else 0.0
+        self._prev, self._gray = self._gray, self._prev
+        gray = self._prev
+        self._has_prev = True
+
+        if self.state == "waiting":
+            from_page = cv2.norm(gray, self._page, cv2.NORM_L1) / gray.size
+            if change > MOTION_THRESHOLD or from_page > MOTION_THRESHOLD:
+                self.state = "moving"
+            return None
+
+        if change >= STILL_THRESHOLD:
+            self.state = "moving"
+            self._still = 0
+            self._best_sharpness = -1.0
+            return None
+
+        self.state = "settling"
+        self._still += 1
+        score = sharpness(gray)
+        if score > self._best_sharpness:
+            self._best_sharpness = score
+            self._best_at = captured_at
+            if self._best is None or self._best.shape != frame.shape:
+                self._best = np.empty_like(frame)
+            np.copyto(self._best, frame)
+            np.copyto(self._best_gray, gray)
+        if self._still < self.settle_frames:
+            return None
+        return self._capture()
+
+    def _capture(self) -> dict:
+        signature = page_signature(self._best_gray)
+        duplicate_of = None
+        for index in range(len(self.signatures) - 1, -1, -1):
+            if float(np.dot(signature.ravel(), self.signatures[index].ravel())) > DUPLICATE_CORRELATION:
+                duplicate_of = index
+                break
+        self.signatures.append(signature)
+        self._page = self._best_gray.copy()
+        self.state = "waiting"
+        self._still = 0
+        capture = {"frame": self._best, "sharpness": self._best_sharpness, "captured_at": self._best_at,
+                   "index": len(self.signatures) - 1, "duplicate_of": duplicate_of}
+        self._best = None  # the caller owns this frame now
+        self._best_sharpness = -1.0
+        return capture
+
+
+def detect_pages(source, fps: float = PREVIEW_FPS, detector: PageTurnDetector | None = None):
+    """
+    Run a frame source through a detector at the preview's analysis rate,
+    yielding captures. With a non-realtime VideoFileSource this replays a
+    recording as fast as it decodes: the headless test path for auto-capture.
+    """
+    detector = detector or PageTurnDetector()
+    frame_interval = getattr(source, "frame_interval", 1.0 / fps)
+    step = max(1, round(1.0 / (fps * frame_interval)))
+    frame, small = None, np.empty((PREVIEW_SIZE[1], PREVIEW_SIZE[0], 3), np.uint8)
+    index = 0
+    while source.grab():
+        index += 1
+        if (index - 1) % step:
+            continue
+        frame = source.retrieve(frame)
+        if frame is None:
+            break
+        cv2.resize(frame, PREVIEW_SIZE, dst=small, interpolation=cv2.INTER_LINEAR)
+        capture = detector.feed(frame, small, index * frame_interval)
+        if capture is not None:
+            yield capture
+    source.release()
+
+
+# --- Command line ---
+# Usage: python AutoCapture_module.py VIDEO [--out DIR]
+# Replays a recorded page-turning video and reports (and optionally saves) the captures.
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Detect page turns in a recorded video.")
+    parser.add_argument("video")
+    parser.add_argument("--out", help="save captured pages here")
+    args = parser.parse_args()
+
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+    try:
+        source = open_frame_source(args.video, realtime=False)
+    except FileNotFoundError:
+        sys.exit(f"No such video: {args.video}")
+    for capture in detect_pages(source):
+        note = "" if capture["duplicate_of"] is None else f"  likely duplicate of capture {capture['duplicate_of'] + 1}"
+        print(f"capture {capture['index'] + 1} at {capture['captured_at']:6.2f}s  "
+              f"sharpness {capture['sharpness']:7.1f}{note}")
+        if args.out:
+            cv2.imwrite(os.path.join(args.out, f"page_{capture['index'] + 1}.jpg"), capture["frame"])
@@ -0,0 +1,203 @@
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import threading
+from Export_module import DEFAULT_FORMAT, EXPORT_FORMATS, export_book, export_path
+from ImagePreprocess_module import DEFAULT_PRESET, PREPROCESS_PRESETS
+from PageOCR_module import DEFAULT_ROTATION, OCR_WORKERS, ROTATION_STRATEGIES, list_page_images
+
+# --- Setup ---
+# Headless batch processing: OCR -> filter -> translate -> store -> export for
+# whole libraries, e.g. overnight on a server with no display.
+BOOKS_DIR = os.path.join(os.getcwd(), "book")
+WORDS_DIR = os.path.join(os.getcwd(), "word")
+DB_PATH = os.path.join(WORDS_DIR, "lightsql.db")
+
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_CANCELLED = 130
+
+
+def find_books(paths: list[str]) -> list[tuple[str, str]]:
+    """
+    (book_name, folder) for each path: a folder holding page images is a
+    book, any other folder a library whose subfolders with page images are
+    books. Book names are folder names, as in the GUI.
+    """
+    books = {}
+    for path in paths:
+        path = os.path.abspath(path)
+        if not os.path.isdir(path):
+            raise FileNotFoundError(path)
+        if list_page_images(path):
+            books.setdefault(os.path.basename(path), path)
+            continue
+        for name in sorted(os.listdir(path)):
+            folder = os.path.join(path, name)
+            if os.path.isdir(folder) and list_page_images(folder):
+                books.setdefault(name, folder)
+    return list(books.items())
+
+
+# --- Progress output ---
+def describe(event: dict) -> str | None:
+    """One human-readable line for the events worth showing on a terminal."""
+    kind, book = event["event"], event.get("book")
+    if kind == "book":
+        return f"{book}: {event['folder']}"
+    if kind == "started":
+        return f"{book}: {event['total'] - event['skipped']} of {event['total']} pages to process"
+    if kind == "page_read":
+        return f"{book}: read page {event['page']} ({event['done']}/{event['total']}, {event['words']} words)"
+    if kind == "resolving":
+        return (f"{book}: resolved {event['resolved']}/{event['lemmas']} lemmas "
+                f"({event['store_hits']} already stored, {event['cache_hits']} cached)")
+    if kind == "exported":
+        if event["rows"] is None or event["rows"] == 0:
+            return f"{book}: nothing to export"
+        return f"{book}: exported {event['rows']} words -> {event['path']}"
+    if kind == "finished":
+        note = f", {event['unresolved_pages']} waiting for translations" if event["unresolved_pages"] else ""
+        return f"{book}: done, {event['pages']} pages in {event['seconds']:.1f}s{note}"
+    if kind == "error":
+        return f"{book}: error: {event['message']}"
+    if kind == "cancelled":
+        return f"{book}: cancelled"
+    if kind == "summary":
+        failed = f", failed: {', '.join(event['failed'])}" if event["failed"] else ""
+        return f"{event['books']} books, {event['pages']} pages in {event['seconds']:.1f}s{failed}"
+    return None
+
+
+class Progress:
+    """
+    Reports events as JSON Lines on stdout (json_lines=True) or as short lines
+    on stderr, worded by describe(event) (None skips the event).
+    """
+
+    def __init__(self, json_lines: bool = False, describe=describe):
+        self.json_lines = json_lines
+        self.describe = describe
+        self.unresolved_pages = 0
+
+    def __call__(self, event: dict):
+        if event["event"] == "page_done" and event.get("unresolved"):
+            self.unresolved_pages += 1
+        if self.json_lines:
+            print(json.dumps({**event, "time": round(time.time(), 3)}, ensure_ascii=False), flush=True)
+            return
+        line = self.describe(event)
+        if line is not None:
+            print(line, file=sys.stderr, flush=True)
+
+
+# --- Batch run ---
+def load_pipeline(args):
+    """Import the pipeline (spaCy, jieba and the indexes) once arguments are parsed, applying --offline."""
+    import BookPipeline_module as pipeline
+
+    if args.offline:
+        from DanishDictionary_module import set_offline
+        set_offline()
+    return pipeline
+
+
+def run_book(pipeline, book_name: str, folder: str, args, emit, cancel: threading.Event,
+             skip: set[str] | None = None) -> set[str]:
+    """Process one book's new or changed pages (except skip) and export it; returns the pages done."""
+    done = pipeline.process_book(book_name, folder, args.db, emit=emit, cancel=cancel, skip=skip,
+                                 workers=args.jobs, force=getattr(args, "force", False), rotation=args.rotation,
+                                 preset=args.preset, use_ocr_cache=not args.no_ocr_cache)
+    if not cancel.is_set() and args.format != "none":
+        os.makedirs(args.out, exist_ok=True)
+        path = export_path(args.out, book_name, args.format)
+        rows = export_book(args.db, path, book_name, args.format)
+        emit({"event": "exported", "book": book_name, "path": path, "format": args.format, "rows": rows})
+    return done
+
+
+def process_library(books: list[tuple[str, str]], args, emit, cancel: threading.Event) -> int:
+    """Process and export each book in turn; returns the exit code."""
+    pipeline = load_pipeline(args)
+    start, pages, failed = time.perf_counter(), 0, []
+    for book_name, folder in books:
+        if cancel.is_set():
+            break
+        book_start = time.perf_counter()
+        emit.unresolved_pages = 0
+        emit({"event": "book", "book": book_name, "folder": folder})
+        try:
+            done = run_book(pipeline, book_name, folder, args, emit, cancel)
+        except Exception as e:
+            emit({"event": "error", "book": book_name, "message": str(e)})
+            failed.append(book_name)
+            continue
+        if cancel.is_set():
+            emit({"event": "cancelled", "book": book_name})
+            break
+        pages += len(done)
+        emit({"event": "finished", "book": book_name, "pages": len(done), "unresolved_pages": emit.unresolved_pages,
+              "seconds": round(time.perf_counter() - book_start, 3)})
+
+    emit({"event": "summary", "books": len(books), "pages": pages, "failed": failed,
+          "cancelled": cancel.is_set(), "seconds": round(time.perf_counter() - start, 3)})
+    if cancel.is_set():
+        return EXIT_CANCELLED
+    return EXIT_FAILED if failed else 0
+
+
+# --- Command line ---
+# Usage: python Batch_process.py [PATH ...] [--jobs N] [--format pdf|csv|jsonl|anki|none]
+#                                [--offline] [--no-ocr-cache] [--force] [--json]
+# PATH is a book folder or a library of book folders (default: book/).
+def add_pipeline_options(parser: argparse.ArgumentParser):
+    """Options shared with Watch_service.py."""
+    parser.add_argument("--jobs", "-j", type=int, default=OCR_WORKERS, help="OCR worker processes")
+    parser.add_argument("--db", default=DB_PATH, help="vocabulary database")
+    parser.add_argument("--out", default=WORDS_DIR, help="export directory")
+    parser.add_argument("--format", choices=[*EXPORT_FORMATS, "none"], default=DEFAULT_FORMAT,
+                        help="export format, or none to only update the database")
+    parser.add_argument("--rotation", choices=ROTATION_STRATEGIES, default=DEFAULT_ROTATION)
+    parser.add_argument("--preset", choices=PREPROCESS_PRESETS, default=DEFAULT_PRESET)
+    parser.add_argument("--no-ocr-cache", action="store_true", help="run Tesseract even for pages OCR'd before")
+    parser.add_argument("--offline", action="store_true",
+                        help="translate from the database and translation cache only; pages with words left "
+                             "untranslated are picked up again by the next online run")
+    parser.add_argument("--json", action="store_true", help="print progress as JSON Lines on stdout")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Process book folders headlessly: OCR, filter, translate, store and export.")
+    parser.add_argument("paths", nargs="*", default=[BOOKS_DIR], help="book folders or library folders")
+    parser.add_argument("--force", action="store_true", help="reprocess every page, not just new or changed ones")
+    add_pipeline_options(parser)
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    emit = Progress(json_lines=args.json)
+    try:
+        books = find_books(args.paths)
+    except FileNotFoundError as e:
+        print(f"No such folder: {e}", file=sys.stderr)
+        sys.exit(EXIT_USAGE)
+    if not books:
+        print(f"No page images found in {', '.join(args.paths)}", file=sys.stderr)
+        sys.exit(EXIT_USAGE)
+
+    # Ctrl-C (or SIGTERM) stops after the current page without storing half a
+    # book; a second Ctrl-C stops at once
+    cancel = threading.Event()
+
+    def request_stop(signum, frame):
+        cancel.set()
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+    sys.exit(process_library(books, args, emit, cancel))
@@ -0,0 +1,307 @@
+import os
+import time
+import queue
+import sqlite3
+import threading
+import jieba
+from DanishDictionary_module import cache, is_translation_error, translate_danish_words
+from Lemmatizer_module import get_lemmatizer
+from FreqIndex_module import get_freq_index
+from LanguageDetect_module import detect_segments, page_language
+from Export_module import DEFAULT_FORMAT, export_book
+from OCRCache_module import file_sha256
+from VocabStore_module import VocabStore
+from ImagePreprocess_module import DEFAULT_PRESET
+from PageOCR_module import DEFAULT_ROTATION, OCR_WORKERS, list_page_images, ocr_pages, page_number_from_filename
+
+# --- Language Resources ---
+# Memory-mapped frequency ranks shared by every process; `w in top` is a rank check
+english_words = get_freq_index("en").top(30000)
+danish_words = get_freq_index("da").top(30000)
+top_freq_danish = get_freq_index("da").top(500)
+
+# Bump when OCR/filtering/translation changes so every page gets reprocessed
+PIPELINE_VERSION = 2
+
+# Lemmas resolved per store lookup + translation batch in a book's resolve phase
+RESOLVE_CHUNK = 500
+
+
+def warm_up():
+    """Load everything the first page would otherwise pay for."""
+    get_lemmatizer().nlp
+    jieba.initialize()
+
+
+# --- Page stages ---
+def select_words(segments) -> dict[str, list[str]]:
+    """Route each line's words through its own language's filter: {lang: words}."""
+    words = {"en": [], "da": [], "zh": []}
+    for _, lang, line_words in segments:
+        for word in line_words:
+            if lang == "en" and word.lower() in english_words:
+                words["en"].append(word)
+            elif lang == "da" and word.lower() in danish_words:
+                words["da"].append(word)
+            elif lang == "zh":
+                words["zh"].extend(jieba.lcut(word))
+    return words
+
+
+def danish_candidates(word_list: list[str]) -> dict[str, str]:
+    """
+    Danish words worth translating (known, longer than 2 letters and not among
+    the most frequent) mapped to the lemma they are stored under.
+    """
+    lemmas = get_lemmatizer().lemmatize_words(word_list)
+    to_translate = {}
+    for word_i in word_list:
+        lemma_i = lemmas[word_i]
+        is_danish = lemma_i in danish_words and len(word_i) > 2
+        if is_danish and lemma_i not in top_freq_danish:
+            to_translate[word_i] = lemma_i.lower()
+    return to_translate
+
+
+def resolve_definitions(store: VocabStore, lemmas) -> tuple[dict[str, str], int]:
+    """
+    Definitions for the lemmas: the library-wide store first, translating
+    (one batched call) and storing only the ones no book has needed before.
+    Returns ({lemma: definition}, number found in the store).
+    """
+    known = {lemma: definition for lemma, definition in store.definitions(lemmas).items()
+             if not is_translation_error(definition)}
+    missing = [lemma for lemma in dict.fromkeys(lemmas) if lemma not in known]
+    translated = {lemma: word_def[1] for lemma, word_def in translate_danish_words(missing, speedy=True).items()}
+    store.add_entries(translated)
+    return {**known, **translated}, len(known)
+
+
+# --- Page manifest ---
+def init_manifest(conn: sqlite3.Connection):
+    conn.execute('''CREATE TABLE IF NOT EXISTS page_manifest (
+                        book_name TEXT NOT NULL,
+                        filename TEXT NOT NULL,
+                        size INTEGER,
+                        mtime REAL,
+                        sha256 TEXT,
+                        version INTEGER,
+                        page_number INTEGER,
+                        processed_at REAL,
+                        PRIMARY KEY (book_name, filename)
+                    )''')
+
+
+def pages_to_process(conn: sqlite3.Connection, book_name: str, img_paths: list[str]) -> tuple[list[str], list[str]]:
+    """
+    Compare page images against the manifest. Returns (new, changed) paths;
+    an image is unchanged if size and mtime match, or failing that its hash
+    does, and it was processed by the current PIPELINE_VERSION.
+    """
+    known = {row[0]: row[1:] for row in conn.execute(
+        'SELECT filename, size, mtime, sha256, version FROM page_manifest WHERE book_name=?', (book_name,))}
+    new, changed = [], []
+    for img_path in img_paths:
+        filename = os.path.basename(img_path)
+        entry = known.get(filename)
+        if entry is None:
+            new.append(img_path)
+            continue
+        size, mtime, sha256, version = entry
+        if version != PIPELINE_VERSION:
+            changed.append(img_path)
+            continue
+        stat = os.stat(img_path)
+        if stat.st_size == size and stat.st_mtime == mtime:
+            continue
+        if file_sha256(img_path) == sha256:
+            # Touched but identical (e.g. copied); just refresh the stat fields
+            conn.execute('UPDATE page_manifest SET size=?, mtime=? WHERE book_name=? AND filename=?',
+                         (stat.st_size, stat.st_mtime, book_name, filename))
+            continue
+        changed.append(img_path)
+    conn.commit()
+    return new, changed
+
+
+def record_page(conn: sqlite3.Connection, book_name: str, img_path: str, page_number: int):
+    stat = os.stat(img_path)
+    conn.execute(
+        'INSERT OR REPLACE INTO page_manifest'
+        '(book_name, filename, size, mtime, sha256, version, page_number, processed_at) '
+        'VALUES(?,?,?,?,?,?,?,?)',
+        (book_name, os.path.basename(img_path), stat.st_size, stat.st_mtime, file_sha256(img_path),
+         PIPELINE_VERSION, page_number, time.time()))
+
+
+# --- Book processing ---
+def process_book(book_name: str, folder_path: str, db_path: str, emit=None, cancel=None,
+                 skip: set[str] | None = None, workers: int | None = None, force: bool = False,
+                 rotation: str = DEFAULT_ROTATION, preset: str = DEFAULT_PRESET,
+                 use_ocr_cache: bool = True) -> set[str]:
+    """
+    OCR, filter and translate the new or changed pages of a book into the
+    vocabulary store in db_path (every page if force is set).
+    Runs in two phases: every page is OCR'd and filtered first, then the
+    book's unique lemmas are resolved once and linked back to their pages,
+    so translation work follows the vocabulary rather than the page count.
+    emit(event: dict) receives progress events; setting the cancel Event stops
+    at the next page or lemma chunk. The pages read by then whose lemmas all
+    have a definition (looked up this run or already in the library) are
+    still stored; the rest are left for the next run, which gets their OCR
+    from the cache. Pages whose image path is in skip are left out.
+    rotation and preset pick the rotation strategy and image preprocessing
+    preset (see PageOCR_module and ImagePreprocess_module).
+    A page with words that got no definition (offline translation) is stored
+    but left out of the manifest, so a later run picks it up again.
+    Returns the image paths completed in this run.
+    """
+    emit = emit or (lambda event: None)
+    skip = skip or set()
+    done = set()
+
+    store = VocabStore(db_path)
+    conn = store.conn
+    book_id = store.book_id(book_name)
+    init_manifest(conn)
+
+    img_paths = [os.path.join(folder_path, f) for f in list_page_images(folder_path)]
+    if force:
+        new, changed = [], img_paths
+    else:
+        new, changed = pages_to_process(conn, book_name, img_paths)
+    changed = set(changed)
+    todo = [p for p in img_paths if (p in changed or p in new) and p not in skip]
+    emit({"event": "started", "book": book_name, "total": len(img_paths), "skipped": len(img_paths) - len(todo)})
+
+    try:
+        # Phase 1: OCR and filter every page, keeping each page's {word: lemma}
+        pages = []
+        for img_path, ocr_data in ocr_pages(todo, workers=workers or OCR_WORKERS, rotation=rotation,
+                                               preset=preset, use_cache=use_ocr_cache):
+            if cancel is not None and cancel.is_set():
+                break
+            page_number = page_number_from_filename(os.path.basename(img_path))
+
+            # Each OCR line gets its own language, so quotes and footnotes in
+            # another language don't get filtered as the page's main one
+            segments = detect_segments(ocr_data)
+            words = select_words(segments)
+            candidates = danish_candidates(words["da"])
+            pages.append((img_path, page_number, candidates))
+            emit({"event": "page_read", "book": book_name, "page": page_number, "path": img_path,
+                  "done": len(img_paths) - len(todo) + len(pages), "total": len(img_paths),
+                  "lang": page_language(segments), "words": len(candidates)})
+
+        # Phase 2: resolve the book's unique lemmas once, in chunks so cancel
+        # stays responsive; lemmas come in page order, so a cancel still
+        # leaves the earlier pages complete
+        lemmas = list(dict.fromkeys(lemma for _, _, candidates in pages for lemma in candidates.values()))
+        hits_before = cache.hits
+        store_hits = 0
+        resolved = set()
+        for i in range(0, len(lemmas), RESOLVE_CHUNK):
+            if cancel is not None and cancel.is_set():
+                break
+            defs, known = resolve_definitions(store, lemmas[i:i + RESOLVE_CHUNK])
+            resolved.update(defs)
+            store_hits += known
+            conn.commit()
+            emit({"event": "resolving", "book": book_name, "resolved": min(i + RESOLVE_CHUNK, len(lemmas)),
+                  "lemmas": len(lemmas), "store_hits": store_hits, "cache_hits": cache.hits - hits_before})
+
+        if cancel is not None and cancel.is_set():
+            # Keep the finished work: pages whose lemmas all have a definition,
+            # counting those the library already had (a local lookup, no network)
+            pending = [lemma for lemma in lemmas if lemma not in resolved]
+            resolved.update(lemma for lemma, definition in store.definitions(pending).items()
+                            if not is_translation_error(definition))
+            pages = [page for page in pages if all(lemma in resolved for lemma in page[2].values())]
+
+        # Fan definitions back out to (word, page) occurrences: local writes only
+        for img_path, page_number, candidates in pages:
+            # A changed page replaces what was stored for it before
+            page_id = store.page_id(book_id, page_number)
+            if img_path in changed:
+                store.clear_page(page_id)
+            store.add_occurrences(page_id, candidates)
+            unresolved = sum(lemma not in resolved for lemma in candidates.values())
+            if not unresolved:
+                record_page(conn, book_name, img_path, page_number)
+            done.add(img_path)
+            emit({"event": "page_done", "book": book_name, "page": page_number, "path": img_path,
+                  "done": len(img_paths) - len(todo) + len(done), "total": len(img_paths),
+                  "words": len(candidates), "unresolved": unresolved})
+        conn.commit()
+    finally:
+        store.close()
+    return done
+
+
+# --- Background jobs ---
+class BookJob:
+    """
+    Runs process_book (and an optional follow-up such as a PDF export) on a
+    worker thread. Progress events are put on self.events for the caller to
+    poll; cancel() stops at the next page or lemma chunk, storing the pages
+    whose words are all looked up by then, and resume() starts a new job that
+    skips the pages this one stored.
+    """
+
+    def __init__(self, book_name: str, folder_path: str, db_path: str, on_finished=None,
+                 skip: set[str] | None = None, workers: int | None = None, force: bool = False,
+                 rotation: str = DEFAULT_ROTATION, preset: str = DEFAULT_PRESET):
+        self.book_name = book_name
+        self.folder_path = folder_path
+        self.db_path = db_path
+        self.on_finished = on_finished
+        self.workers = workers
+        self.force = force
+        self.rotation = rotation
+        self.preset = preset
+        self.done = set(skip or ())
+        self.events = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> "BookJob":
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def is_running(self) -> bool:
+        return self.thread.is_alive()
+
+    def resume(self) -> "BookJob":
+        return BookJob(self.book_name, self.folder_path, self.db_path, on_finished=self.on_finished,
+                       skip=self.done, workers=self.workers, force=self.force,
+                       rotation=self.rotation, preset=self.preset).start()
+
+    def _emit(self, event: dict):
+        if event["event"] == "page_done":
+            self.done.add(event["path"])
+        self.events.put(event)
+
+    def _run(self):
+        try:
+            process_book(self.book_name, self.folder_path, self.db_path, emit=self._emit,
+                         cancel=self.cancel_event, skip=self.done, workers=self.workers, force=self.force,
+                         rotation=self.rotation, preset=self.preset)
+            if self.cancel_event.is_set():
+                self.events.put({"event": "cancelled", "book": self.book_name})
+                return
+            result = self.on_finished(self) if self.on_finished else None
+            self.events.put({"event": "finished", "book": self.book_name, "result": result})
+        except Exception as e:
+            self.events.put({"event": "error", "book": self.book_name, "message": str(e)})
+
+
+def start_book_job(book_name: str, folder_path: str, db_path: str, export_path: str | None = None,
+                   export_format: str = DEFAULT_FORMAT, **options) -> BookJob:
+    """Start a BookJob that exports the book to export_path (pdf, csv, jsonl or anki) when it finishes."""
+    on_finished = None
+    if export_path:
+        on_finished = lambda job: export_book(db_path, export_path, book_name, export_format)
+    return BookJob(book_name, folder_path, db_path, on_finished=on_finished, **options).start()
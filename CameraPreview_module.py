@@ -0,0 +1,243 @@
+import os
+import threading
+import time
+import cv2
+import numpy as np
+
+# --- Setup ---
+PREVIEW_FPS = 15
+PREVIEW_SIZE = (480, 360)  # width, height
+# Seconds between stats samples (CPU %, preview rate, latency)
+STATS_INTERVAL = 1.0
+
+
+# --- Frame sources ---
+# A frame source hands out BGR frames: grab() advances to the next frame
+# without decoding it, retrieve(out) decodes the grabbed frame into out when
+# out has the right shape (no new allocation), read(out) does both.
+class CameraSource:
+    """A live camera; frames arrive at the camera's own rate."""
+
+    realtime = True
+
+    def __init__(self, index: int = 0):
+        self.cap = cv2.VideoCapture(index)
+
+    def is_opened(self) -> bool:
+        return self.cap.isOpened()
+
+    def grab(self) -> bool:
+        return self.cap.grab()
+
+    def retrieve(self, out: np.ndarray | None = None) -> np.ndarray | None:
+        ok, frame = self.cap.retrieve(out)
+        return frame if ok else None
+
+    def read(self, out: np.ndarray | None = None) -> np.ndarray | None:
+        return self.retrieve(out) if self.grab() else None
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource(CameraSource):
+    """
+    A recorded video standing in for the camera (for testing without one).
+    With realtime, frames are paced at the file's frame rate like a camera;
+    otherwise they come as fast as they can be decoded.
+    """
+
+    def __init__(self, path: str, realtime: bool = True, loop: bool = False):
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+        self.realtime = realtime
+        self.loop = loop
+        fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.frame_interval = 1.0 / fps if fps and fps > 0 else 1.0 / 30
+        self._next_frame_at = None
+
+    def grab(self) -> bool:
+        if self.realtime:
+            now = time.perf_counter()
+            if self._next_frame_at is not None and now < self._next_frame_at:
+                time.sleep(self._next_frame_at - now)
+            self._next_frame_at = max(now, self._next_frame_at or now) + self.frame_interval
+        if self.cap.grab():
+            return True
+        if self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            return self.cap.grab()
+        return False
+
+
+def open_frame_source(spec: str | int = 0, realtime: bool = True, loop: bool = False) -> CameraSource:
+    """A camera index (0, "1") or a video file path."""
+    if isinstance(spec, int) or str(spec).isdigit():
+        return CameraSource(int(spec))
+    if not os.path.exists(spec):
+        raise FileNotFoundError(spec)
+    return VideoFileSource(spec, realtime=realtime, loop=loop)
+
+
+# --- Handoff to the UI thread ---
+class FrameSlot:
+    """
+    Single-slot, drop-oldest handoff of preview frames between the capture
+    thread and the UI thread. Three preallocated buffers rotate between the
+    writer, the slot and the reader, so no frame is allocated per update.
+    """
+
+    def __init__(self, shape: tuple[int, ...]):
+        self._free = [np.empty(shape, np.uint8) for _ in range(3)]
+        self._latest = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def writable(self) -> np.ndarray:
+        with self._lock:
+            return self._free.pop()
+
+    def publish(self, buffer: np.ndarray, captured_at: float) -> bool:
+        """Put a frame in the slot; True if it was empty (the reader needs waking)."""
+        with self._lock:
+            was_empty = self._latest is None
+            if not was_empty:
+                # The UI never took the previous frame; recycle it
+                self._free.append(self._latest[0])
+                self.dropped += 1
+            self._latest = (buffer, captured_at)
+            return was_empty
+
+    def take(self) -> tuple[np.ndarray, float] | None:
+        """The newest frame and its capture time, or None; hand the buffer back with release()."""
+        with self._lock:
+            latest, self._latest = self._latest, None
+            return latest
+
+    def release(self, buffer: np.ndarray):
+        with self._lock:
+            self._free.append(buffer)
+
+
+# --- Preview pipeline ---
+class PreviewPipeline:
+    """
+    Reads frames from a source on a background thread and publishes at most
+    fps downscaled RGB preview frames to a FrameSlot. Frames in between are
+    grabbed but never decoded. The latest full-resolution frame is kept for
+    captures. notify() is called from the capture thread when a frame lands
+    in an empty slot, so the UI is woken once per frame it can actually show.
+    on_frame(frame, small, captured_at), if set, sees every previewed frame
+    on the capture thread (frame and small are reused buffers).
+    """
+
+    def __init__(self, source: CameraSource, fps: float = PREVIEW_FPS, size: tuple[int, int] = PREVIEW_SIZE,
+                 notify=None):
+        self.source = source
+        self.notify = notify
+        self.on_frame = None
+        self.fps = fps
+        self.size = size
+        self.slot = FrameSlot((size[1], size[0], 3))
+        self.running = False
+        self.finished = False  # the source ran out of frames (video files)
+        self.thread = None
+
+        self._raw = None  # latest full-resolution frame, reused
+        self._raw_lock = threading.Lock()
+        self._small = np.empty((size[1], size[0], 3), np.uint8)
+
+        self._stats_lock = threading.Lock()
+        self._stats_wall = time.perf_counter()
+        self._stats_cpu = time.process_time()
+        self._shown = 0
+        self._latencies = []
+        self.frames_read = 0
+
+    @property
+    def interval(self) -> float:
+        return 1.0 / self.fps
+
+    def start(self) -> "PreviewPipeline":
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=2)
+        self.source.release()
+
+    def _run(self):
+        next_preview = time.perf_counter()
+        while self.running:
+            if not self.source.grab():
+                if isinstance(self.source, VideoFileSource):
+                    self.finished = True
+                    break
+                time.sleep(0.01)  # camera hiccup; try again
+                continue
+            self.frames_read += 1
+            now = time.perf_counter()
+            if self.source.realtime and now < next_preview:
+                continue  # over the FPS cap: skip without decoding
+            next_preview = max(next_preview + self.interval, now)
+
+            with self._raw_lock:
+                frame = self.source.retrieve(self._raw)
+                if frame is None:
+                    continue
+                self._raw = frame
+                cv2.resize(frame, self.size, dst=self._small, interpolation=cv2.INTER_LINEAR)
+                if self.on_frame is not None:
+                    self.on_frame(frame, self._small, now)
+
+            buffer = self.slot.writable()
+            cv2.cvtColor(self._small, cv2.COLOR_BGR2RGB, dst=buffer)
+            if self.slot.publish(buffer, now) and self.notify is not None:
+                self.notify()
+        if self.finished and self.notify is not None:
+            self.notify()
+
+    # --- Consumer side ---
+    def take(self) -> tuple[np.ndarray, float] | None:
+        return self.slot.take()
+
+    def release(self, buffer: np.ndarray):
+        self.slot.release(buffer)
+
+    def shown(self, captured_at: float):
+        """Record that a frame captured at captured_at is now on screen."""
+        with self._stats_lock:
+            self._shown += 1
+            self._latencies.append(time.perf_counter() - captured_at)
+
+    def latest_frame(self) -> np.ndarray | None:
+        """A copy of the newest full-resolution frame (for captures)."""
+        with self._raw_lock:
+            return None if self._raw is None else self._raw.copy()
+
+    def stats(self) -> dict:
+        """Process CPU %, preview rate and capture-to-screen latency since the last call."""
+        with self._stats_lock:
+            wall, cpu = time.perf_counter(), time.process_time()
+            elapsed = max(wall - self._stats_wall, 1e-9)
+            latencies = self._latencies
+            result = {
+                "cpu_percent": 100 * (cpu - self._stats_cpu) / elapsed,
+                "preview_fps": self._shown / elapsed,
+                "latency_ms": 1000 * sum(latencies) / len(latencies) if latencies else None,
+                "latency_max_ms": 1000 * max(latencies) if latencies else None,
+                "dropped": self.slot.dropped,
+                "frames_read": self.frames_read,
+            }
+            self._stats_wall, self._stats_cpu = wall, cpu
+            self._shown, self._latencies = 0, []
+        return result
+
+
+def format_stats(stats: dict) -> str:
+    latency = "-" if stats["latency_ms"] is None else f"{stats['latency_ms']:.0f} ms"
+    return f"CPU {stats['cpu_percent']:.0f}%  preview {stats['preview_fps']:.1f} fps  latency {latency}"
@@ -0,0 +1,139 @@
+import os
+import queue
+import threading
+import time
+import cv2
+import numpy as np
+
+# --- Capture encoding ---
+# Output file extension per capture format (all readable by the OCR pipeline)
+CAPTURE_FORMATS = {"jpeg": ".jpg", "png": ".png", "webp": ".webp"}
+DEFAULT_FORMAT = "jpeg"
+# Default quality (1-100) for the lossy formats
+DEFAULT_QUALITY = {"jpeg": 92, "webp": 90}
+# zlib level for PNG: higher is smaller and slower
+PNG_COMPRESSION = 3
+# Captures waiting to be written before submit() makes the caller wait
+WRITE_QUEUE_SIZE = 32
+# Suffix of a capture being written; never matches an image extension
+PARTIAL_SUFFIX = ".part"
+
+
+def capture_settings(fmt: str = DEFAULT_FORMAT, quality: int | None = None, grayscale: bool = False,
+                     max_side: int | None = None) -> dict:
+    """
+    How captures are stored: format (jpeg, png or webp), quality for jpeg and
+    webp, grayscale to drop colour, max_side to shrink the long side.
+    """
+    if fmt not in CAPTURE_FORMATS:
+        raise ValueError(f"Unknown capture format: {fmt}")
+    return {"format": fmt, "quality": quality or DEFAULT_QUALITY.get(fmt), "grayscale": grayscale,
+            "max_side": max_side}
+
+
+def encode_capture(frame: np.ndarray, settings: dict) -> bytes:
+    """Encode a BGR frame as the settings ask."""
+    if settings.get("max_side"):
+        height, width = frame.shape[:2]
+        scale = settings["max_side"] / max(height, width)
+        if scale < 1:
+            # INTER_AREA avoids aliasing on big reductions but is several times
+            # slower than cubic at the mild ones, where cubic looks as good
+            interpolation = cv2.INTER_AREA if scale <= 0.5 else cv2.INTER_CUBIC
+            frame = cv2.resize(frame, (round(width * scale), round(height * scale)), interpolation=interpolation)
+    if settings.get("grayscale") and frame.ndim == 3:
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+    fmt = settings["format"]
+    if fmt == "jpeg":
+        params = [cv2.IMWRITE_JPEG_QUALITY, settings["quality"]]
+    elif fmt == "webp":
+        params = [cv2.IMWRITE_WEBP_QUALITY, settings["quality"]]
+    else:
+        params = [cv2.IMWRITE_PNG_COMPRESSION, PNG_COMPRESSION]
+    ok, encoded = cv2.imencode(CAPTURE_FORMATS[fmt], frame, params)
+    if not ok:
+        raise ValueError(f"Could not encode capture as {fmt}")
+    return encoded.tobytes()
+
+
+def unique_path(folder: str, stem: str, ext: str) -> str:
+    """folder/stem.ext, or stem_1.ext, stem_2.ext ... if taken."""
+    filepath = os.path.join(folder, f"{stem}{ext}")
+    counter = 1
+    while os.path.exists(filepath):
+        filepath = os.path.join(folder, f"{stem}_{counter}{ext}")
+        counter += 1
+    return filepath
+
+
+def write_capture(frame: np.ndarray, folder: str, stem: str, settings: dict) -> str:
+    """
+    Encode and durably store a capture, returning its path. The file appears
+    under its final name only once complete (written as .part, fsynced and
+    renamed), so folder watchers never pick up half a page.
+    """
+    data = encode_capture(frame, settings)
+    os.makedirs(folder, exist_ok=True)
+    filepath = unique_path(folder, stem, CAPTURE_FORMATS[settings["format"]])
+    tmp_path = filepath + PARTIAL_SUFFIX
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return filepath
+
+
+# --- Background writer ---
+class CaptureWriter:
+    """
+    Encodes and writes captures on a background thread, in submission order,
+    so the UI never waits on the encoder or the disk. Results are put on
+    self.events for the UI to poll:
+        {"event": "saved", "path", "bytes", "seconds", "tag"}
+        {"event": "error", "folder", "stem", "message", "tag"}
+    tag is whatever the caller passed to submit(), handed back untouched.
+    """
+
+    def __init__(self):
+        self.jobs = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        self.events = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, frame: np.ndarray, folder: str, stem: str, settings: dict, tag=None):
+        """Queue a capture; the writer owns frame from here on (pass a copy)."""
+        self.jobs.put((frame, folder, stem, settings, tag))
+
+    def pending(self) -> int:
+        return self.jobs.unfinished_tasks
+
+    def close(self, timeout: float | None = None):
+        """Finish the queued writes, then stop the thread."""
+        self.jobs.put(None)
+        self.thread.join(timeout)
+
+    def _run(self):
+        while True:
+            job = self.jobs.get()
+            try:
+                if job is None:
+                    return
+                frame, folder, stem, settings, tag = job
+                start = time.perf_counter()
+                try:
+                    filepath = write_capture(frame, folder, stem, settings)
+                except (OSError, ValueError, cv2.error) as e:
+                    self.events.put({"event": "error", "folder": folder, "stem": stem, "message": str(e),
+                                     "tag": tag})
+                    continue
+                self.events.put({"event": "saved", "path": filepath, "bytes": os.path.getsize(filepath),
+                                 "seconds": time.perf_counter() - start, "tag": tag})
+            finally:
+                self.jobs.task_done()
@@ -0,0 +1,124 @@
+import csv
+import os
+import sqlite3
+import sys
+import time
+from functools import lru_cache
+
+# --- Setup ---
+DANNET_CSV_DIR = os.path.join(os.getcwd(), "dannet-csv")
+DANNET_INDEX_PATH = os.path.join(DANNET_CSV_DIR, "dannet_index.db")
+
+# Bump when the schema changes so stale index files get rebuilt
+INDEX_VERSION = 1
+
+
+# --- Build step ---
+def _read_csv(path: str):
+    with open(path, newline="", encoding="utf-8") as f:
+        yield from csv.reader(f)
+
+
+def build_index(csv_dir: str = DANNET_CSV_DIR, index_path: str = DANNET_INDEX_PATH) -> str:
+    """
+    Compile words.csv -> senses.csv -> synsets.csv into a SQLite lookup file.
+    synsets.csv (definitions) is optional; without it only synset ids are indexed.
+    """
+    tmp_path = index_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.executescript('''
+        CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE words (word TEXT PRIMARY KEY, form TEXT, pos TEXT) WITHOUT ROWID;
+        CREATE TABLE synsets (synset TEXT PRIMARY KEY, definition TEXT) WITHOUT ROWID;
+        CREATE TABLE lemmas (form TEXT NOT NULL, synset TEXT NOT NULL, pos TEXT, note TEXT,
+                             PRIMARY KEY (form, synset)) WITHOUT ROWID;
+    ''')
+
+    conn.executemany('INSERT OR IGNORE INTO words VALUES(?,?,?)',
+                     (row[:3] for row in _read_csv(os.path.join(csv_dir, "words.csv")) if len(row) >= 3))
+
+    synsets_csv = os.path.join(csv_dir, "synsets.csv")
+    has_definitions = os.path.exists(synsets_csv)
+    if has_definitions:
+        conn.executemany('INSERT OR IGNORE INTO synsets VALUES(?,?)',
+                         ((row[0], row[1] or None) for row in _read_csv(synsets_csv) if len(row) >= 2))
+
+    conn.executemany('INSERT OR IGNORE INTO lemmas(form, synset, pos, note) '
+                     'SELECT lower(form), ?, pos, ? FROM words WHERE word=?',
+                     ((row[1], row[3] or None, row[2]) for row in _read_csv(os.path.join(csv_dir, "senses.csv"))
+                      if len(row) >= 4))
+
+    conn.execute("DROP TABLE words")
+    conn.executemany('INSERT INTO meta VALUES(?,?)', [
+        ("version", str(INDEX_VERSION)),
+        ("has_definitions", "1" if has_definitions else "0"),
+        ("built", str(time.time())),
+    ])
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+
+    os.replace(tmp_path, index_path)
+    return index_path
+
+
+# --- Lookup API ---
+class DanNetIndex:
+    """Read-only lemma -> synset lookups on a compiled DanNet index."""
+
+    def __init__(self, index_path: str = DANNET_INDEX_PATH):
+        self.conn = sqlite3.connect(f"file:{index_path}?mode=ro", uri=True, check_same_thread=False)
+        meta = dict(self.conn.execute('SELECT key, value FROM meta'))
+        self.version = int(meta.get("version", 0))
+        self.has_definitions = meta.get("has_definitions") == "1"
+
+    @lru_cache(maxsize=4096)
+    def synsets(self, lemma: str) -> tuple[str, ...]:
+        rows = self.conn.execute('SELECT synset FROM lemmas WHERE form=?', (lemma.lower(),))
+        return tuple(r[0] for r in rows)
+
+    @lru_cache(maxsize=4096)
+    def definitions(self, lemma: str) -> tuple[str, ...]:
+        rows = self.conn.execute(
+            'SELECT s.definition FROM lemmas l JOIN synsets s ON s.synset = l.synset '
+            'WHERE l.form=? AND s.definition IS NOT NULL', (lemma.lower(),))
+        return tuple(r[0] for r in rows)
+
+    def __contains__(self, lemma: str) -> bool:
+        return bool(self.synsets(lemma))
+
+
+_index = None
+
+
+def get_index(index_path: str = DANNET_INDEX_PATH) -> DanNetIndex | None:
+    """Open the compiled index once per process; None if it hasn't been built."""
+    global _index
+    if _index is None and os.path.exists(index_path):
+        index = DanNetIndex(index_path)
+        if index.version == INDEX_VERSION:
+            _index = index
+    return _index
+
+
+# --- Build from the command line ---
+if __name__ == "__main__":
+    csv_dir = sys.argv[1] if len(sys.argv) > 1 else DANNET_CSV_DIR
+    start = time.perf_counter()
+    path = build_index(csv_dir)
+    print(f"Built {path} ({os.path.getsize(path) / 1e6:.1f} MB) in {time.perf_counter() - start:.1f}s")
+
+    index = DanNetIndex(path)
+    start = time.perf_counter()
+    n = 10000
+    for _ in range(n):
+        index.synsets.__wrapped__(index, "hund")
+    per_lookup = (time.perf_counter() - start) / n * 1e6
+    print(f"'hund' -> {index.synsets('hund')} ({per_lookup:.1f} µs/lookup uncached)")
+    if not index.has_definitions:
+        print("Note: synsets.csv not found, index has no definitions")
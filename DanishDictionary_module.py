@@ -1,25 +1,157 @@
+import threading
 import requests
 from deep_translator import GoogleTranslator
+from deep_translator.exceptions import RequestError, TooManyRequests
 import wn
-from functools import lru_cache
+from functools import lru_cache, partial
+from TranslationCache_module import get_cache
+from LookupEngine_module import LookupEngine
+from DanNetIndex_module import get_index
 
 # --- Setup ---
 # Load WordNet resource only when needed
 WN_LOADED = False
 
-# Initialize GoogleTranslator globally
-translator = GoogleTranslator(source='da', target='en')
+# On-disk cache shared across runs and entry points
+cache = get_cache()
 
-# Reuse a single session for Wiktionary requests
-session = requests.Session()
-session.headers.update({"User-Agent": "Camera2Dict/1.0 (your_email@example.com)"})
+# Google rejects payloads over 5000 characters; leave some headroom
+BATCH_CHARS = 4500
+
+WIKTIONARY_URL = "https://da.wiktionary.org/w/api.php"
+USER_AGENT = "Camera2Dict/1.0 (your_email@example.com)"
+
+# Concurrency for bulk lookups
+MAX_IN_FLIGHT = 8
+REQUESTS_PER_SECOND = 10.0
+
+# Offline: batch lookups answer from the on-disk cache only, never the
+# network; words the cache can't translate are left out (see set_offline)
+OFFLINE = False
+
+# One requests.Session and one GoogleTranslator per thread: neither is safe
+# to share between the lookup engine's threads (the translator keeps the text
+# being sent on the instance)
+_local = threading.local()
+
+
+def set_offline(offline: bool = True):
+    global OFFLINE
+    OFFLINE = offline
+
+
+def get_session() -> requests.Session:
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update({"User-Agent": USER_AGENT})
+        _local.session = session
+    return session
+
+
+def get_translator() -> GoogleTranslator:
+    translator = getattr(_local, "translator", None)
+    if translator is None:
+        translator = GoogleTranslator(source='da', target='en')
+        _local.translator = translator
+    return translator
+
+
+def _translate(text: str) -> str:
+    return get_translator().translate(text)
+
+
+def _is_transient(exc: Exception) -> bool:
+    """Only retry errors that may go away: timeouts, dropped connections, 429 and 5xx."""
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout, TooManyRequests, RequestError)):
+        return True
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return exc.response.status_code == 429 or exc.response.status_code >= 500
+    return False
+
+
+engine = LookupEngine(max_in_flight=MAX_IN_FLIGHT, rate=REQUESTS_PER_SECOND, should_retry=_is_transient)
+
+
+# --- Cached translation ---
+def translate_text(text: str) -> str:
+    """Translate Danish text to English, going through the on-disk cache first."""
+    hit, value = cache.get("google", "da", "en", text)
+    if hit:
+        return value
+    value = engine.call(_translate, text)
+    cache.put("google", "da", "en", text, value)
+    return value
+
+
+def _chunk_texts(texts: list[str], limit: int = BATCH_CHARS):
+    """Group texts into batches whose newline-joined size stays under limit."""
+    batch, size = [], 0
+    for text in texts:
+        if batch and size + len(text) + 1 > limit:
+            yield batch
+            batch, size = [], 0
+        batch.append(text)
+        size += len(text) + 1
+    if batch:
+        yield batch
+
+
+def _translate_joined(batch: list[str]) -> dict[str, str]:
+    """
+    Translate a batch of texts with one request by joining them with newlines.
+    Raises ValueError if the line structure doesn't survive the round trip.
+    """
+    if len(batch) == 1:
+        return {batch[0]: _translate(batch[0])}
+
+    # Texts may contain newlines themselves, so translate line by line
+    lines = [text.split("\n") for text in batch]
+    flat = [line for text_lines in lines for line in text_lines]
+    joined = _translate("\n".join(flat))
+    out_lines = joined.split("\n") if joined else []
+    if len(out_lines) != len(flat):
+        raise ValueError(f"expected {len(flat)} lines back, got {len(out_lines)}")
+
+    translations, pos = {}, 0
+    for text, text_lines in zip(batch, lines):
+        translations[text] = "\n".join(line.strip() for line in out_lines[pos:pos + len(text_lines)])
+        pos += len(text_lines)
+    return translations
+
+
+def translate_texts(texts) -> dict[str, str]:
+    """
+    Translate many Danish texts to English with as few backend calls as possible.
+    Duplicates are collapsed, cache hits are served locally and the misses are
+    sent concurrently in newline-joined batches; a batch that fails falls back
+    to one request per text. Failed texts map to an error string.
+    """
+    unique = list(dict.fromkeys(t for t in texts if t))
+    result = cache.get_many("google", "da", "en", unique)
+    misses = [] if OFFLINE else [t for t in unique if t not in result]
+
+    batches = list(_chunk_texts(misses))
+    leftovers = []
+    for batch, translations in zip(batches, engine.map(_translate_joined, batches)):
+        if isinstance(translations, Exception):
+            leftovers.extend(batch)
+        else:
+            cache.put_many("google", "da", "en", translations)
+            result.update(translations)
+
+    for text, translation in zip(leftovers, engine.map(_translate, leftovers)):
+        if isinstance(translation, Exception):
+            result[text] = f"[Translation error: {translation}]"
+        else:
+            cache.put("google", "da", "en", text, translation)
+            result[text] = translation
+    return result
 
 
 # --- Wiktionary lookup ---
-@lru_cache(maxsize=256)
-def get_danish_definition(word: str) -> str | None:
-    """Fetch Danish definition of a word from Wiktionary (if available)."""
-    url = "https://da.wiktionary.org/w/api.php"
+def fetch_danish_definition(word: str, url: str = WIKTIONARY_URL) -> str | None:
+    """Query Wiktionary for a word's intro extract. Raises on network errors."""
     params = {
         "action": "query",
         "format": "json",
@@ -28,35 +160,74 @@ def get_danish_definition(word: str) -> str | None:
         "exintro": True,
         "explaintext": True,
     }
+    response = get_session().get(url, params=params, timeout=5)
+    response.raise_for_status()
+    data = response.json()
+
+    page = next(iter(data.get("query", {}).get("pages", {}).values()), {})
+    return page.get("extract", "").strip() or None
+
+
+@lru_cache(maxsize=256)
+def get_danish_definition(word: str) -> str | None:
+    """Fetch Danish definition of a word from Wiktionary (if available)."""
+    hit, definition = cache.get("wiktionary", "da", "da", word)
+    if hit:
+        return definition
 
     try:
-        response = session.get(url, params=params, timeout=5)
-        response.raise_for_status()
-        data = response.json()
+        definition = engine.call(fetch_danish_definition, word)
     except Exception:
         return None
 
-    page = next(iter(data.get("query", {}).get("pages", {}).values()), {})
-    definition = page.get("extract", "").strip()
-    return definition if definition else None
+    # Network errors are not cached, but a missing entry is
+    cache.put("wiktionary", "da", "da", word, definition)
+    return definition
+
+
+def get_danish_definitions(words, url: str = WIKTIONARY_URL) -> dict[str, str | None]:
+    """Fetch Wiktionary definitions for many words concurrently."""
+    unique = list(dict.fromkeys(words))
+    result = cache.get_many("wiktionary", "da", "da", unique)
+    misses = [w for w in unique if w not in result]
+    if OFFLINE:
+        return {**dict.fromkeys(misses), **result}
+
+    fetched = {}
+    for word, definition in zip(misses, engine.map(partial(fetch_danish_definition, url=url), misses)):
+        if isinstance(definition, Exception):
+            result[word] = None
+        else:
+            fetched[word] = result[word] = definition
+    cache.put_many("wiktionary", "da", "da", fetched)
+    return result
 
 
 # --- WordNet lookup ---
-@lru_cache(maxsize=256)
-def get_danish_lexicon(word: str) -> list[str]:
-    """Retrieve English translations of Danish WordNet definitions."""
+def get_lexicon_definitions(word: str) -> list[str]:
+    """
+    Return the Danish WordNet definitions of a word, from the compiled DanNet
+    index if one has been built (python DanNetIndex_module.py), else from wn.
+    """
+    index = get_index()
+    if index is not None and index.has_definitions:
+        return list(index.definitions(word))
+
     global WN_LOADED
     if not WN_LOADED:
         wn.add("dannet-wn-lmf.xml.gz")
         WN_LOADED = True
 
-    synsets = wn.synsets(word, lang="da")
+    return [s.definition() for s in wn.synsets(word, lang="da")]
 
+
+@lru_cache(maxsize=256)
+def get_danish_lexicon(word: str) -> list[str]:
+    """Retrieve English translations of Danish WordNet definitions."""
     translations = []
-    for i_num, s in enumerate(synsets):
-        da_def = s.definition()
+    for i_num, da_def in enumerate(get_lexicon_definitions(word)):
         try:
-            en_def = translator.translate(da_def)
+            en_def = translate_text(da_def)
         except Exception as e:
             en_def = f"[Translation error: {e}]"
         translations.append(f"{i_num}: {en_def}")
@@ -64,6 +235,11 @@ def get_danish_lexicon(word: str) -> list[str]:
 
 
 # --- Combined translation ---
+def is_translation_error(text) -> bool:
+    """True for the placeholder stored when a translation failed (worth retrying later)."""
+    return isinstance(text, str) and text.startswith("[Translation error")
+
+
 def translate_danish_word(word: str, speedy: bool = False) -> tuple[str | None, str | list[str]]:
     """
     Translate a Danish word:
@@ -79,18 +255,52 @@ def translate_danish_word(word: str, speedy: bool = False) -> tuple[str | None,
     danish_def = get_danish_definition(word)
     if danish_def:
         try:
-            english_def = translator.translate(danish_def)
+            english_def = translate_text(danish_def)
         except Exception as e:
             english_def = f"[Translation error: {e}]"
         return danish_def, english_def
 
     try:
-        english_translation = translator.translate(word)
+        english_translation = translate_text(word)
     except Exception as e:
         english_translation = f"[Translation error: {e}]"
     return None, english_translation
 
 
+# --- Batched translation ---
+def translate_danish_words(words, speedy: bool = False) -> dict[str, tuple[str | None, str | list[str]]]:
+    """
+    Translate many Danish words at once, following the same rules as
+    translate_danish_word. Words are deduplicated and all definitions and
+    fallbacks are translated in a handful of batched requests.
+    Returns {word: (danish_definition, english)}; offline, words without a
+    cached translation are left out.
+    """
+    unique = list(dict.fromkeys(words))
+    results = {}
+
+    remaining = unique
+    if not speedy:
+        lexicons = {w: get_lexicon_definitions(w) for w in unique}
+        translated = translate_texts(d for defs in lexicons.values() for d in defs)
+        remaining = []
+        for w in unique:
+            if OFFLINE and lexicons[w] and not all(d in translated for d in lexicons[w]):
+                continue
+            if lexicons[w]:
+                results[w] = (None, [f"{i_num}: {translated.get(d, '')}" for i_num, d in enumerate(lexicons[w])])
+            else:
+                remaining.append(w)
+
+    danish_defs = get_danish_definitions(remaining)
+    translated = translate_texts(danish_defs[w] or w for w in remaining)
+    for w in remaining:
+        if OFFLINE and (danish_defs[w] or w) not in translated:
+            continue
+        results[w] = (danish_defs[w], translated.get(danish_defs[w] or w, ""))
+    return results
+
+
 # --- Example usage ---
 if __name__ == "__main__":
     words = ["går", "jeg", "hund", "Normalt"]
@@ -101,6 +311,11 @@ if __name__ == "__main__":
         print(f"  Danish definition: {da_def}")
         print(f"  English: {en_def}")
 
+    # Example batch
+    for w, (da_def, en_def) in translate_danish_words(words, speedy=True).items():
+        print(f"{w}: {en_def}")
+
     # Example single word
     word = "hund"
     print("Lexicon for 'hund':", get_danish_lexicon(word))
+    print("Cache:", cache.stats())
@@ -0,0 +1,235 @@
+import csv
+import io
+import json
+import os
+import sys
+import time
+from html import escape as html_escape
+from itertools import chain
+from xml.sax.saxutils import escape
+from VocabStore_module import VocabStore
+
+# --- Formats ---
+# Output file extension per export format; "anki" is a tab-separated file
+# with Anki import headers (File > Import picks up separator, HTML and tags)
+EXPORT_FORMATS = {"pdf": ".pdf", "csv": ".csv", "jsonl": ".jsonl", "anki": ".txt"}
+DEFAULT_FORMAT = "pdf"
+
+# --- PDF layout ---
+HEADER = ["Word", "Definition", "Page Number", "Book Name"]
+# Fits letter width inside the default 1-inch margins; long cells wrap
+COL_WIDTHS = [90, 230, 50, 98]
+FONT_NAME = "Helvetica"
+FONT_SIZE = 9
+LEADING = 11
+# reportlab's default cell padding (left/right, top/bottom)
+CELL_PAD_X = 6
+CELL_PAD_Y = 3
+# Fill pages to this fraction of the frame height, leaving room for rounding
+PAGE_FILL = 0.97
+
+
+class _CountedRows:
+    """Streams a cursor's rows, counting them as they go past."""
+
+    def __init__(self, cursor):
+        self.first = next(cursor, None)
+        self.cursor = cursor
+        self.count = 0
+
+    def empty(self) -> bool:
+        return self.first is None
+
+    def __iter__(self):
+        if self.first is None:
+            return
+        for row in chain([self.first], self.cursor):
+            self.count += 1
+            yield row
+
+
+class _ChunkFeed(list):
+    """
+    Flowable list for doc.build() that pulls the next flowable from a
+    generator only when the list runs dry, so just one page-sized table
+    exists at a time instead of one for the whole export.
+    """
+
+    def __init__(self, flowables):
+        super().__init__()
+        self.flowables = flowables
+
+    def __len__(self):
+        if not super().__len__():
+            flowable = next(self.flowables, None)
+            if flowable is not None:
+                self.append(flowable)
+        return super().__len__()
+
+
+def _cell(value, width: float, style) -> tuple[object, float]:
+    """
+    A table cell and its height: a plain string when it fits on one line,
+    otherwise a wrapping Paragraph (far more expensive to lay out).
+    """
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+    from reportlab.platypus import Paragraph
+
+    text = "" if value is None else str(value)
+    inner = width - 2 * CELL_PAD_X
+    if "\n" not in text and stringWidth(text, FONT_NAME, FONT_SIZE) <= inner:
+        return text, LEADING
+    paragraph = Paragraph(escape(text).replace("\n", "<br/>"), style)
+    return paragraph, paragraph.wrap(inner, 1e6)[1]
+
+
+def _page_tables(rows, frame_height: float, style, table_style):
+    """Yield LongTables of rows that each fill about one page, with a page break between them."""
+    from reportlab.platypus import LongTable, PageBreak
+
+    header_height = LEADING + 2 * CELL_PAD_Y + 3  # plus the header's extra bottom padding
+    budget = frame_height * PAGE_FILL - header_height
+    chunk, used = [], 0.0
+    for row in rows:
+        cells = [_cell(value, width, style) for value, width in zip(row, COL_WIDTHS)]
+        height = max(h for _, h in cells) + 2 * CELL_PAD_Y
+        if chunk and used + height > budget:
+            yield LongTable([HEADER] + chunk, colWidths=COL_WIDTHS, repeatRows=1, style=table_style)
+            yield PageBreak()
+            chunk, used = [], 0.0
+        chunk.append([c for c, _ in cells])
+        used += height
+    if chunk:
+        yield LongTable([HEADER] + chunk, colWidths=COL_WIDTHS, repeatRows=1, style=table_style)
+
+
+# --- PDF Export Function ---
+def export_word_definitions_to_pdf(db_path, output_pdf, book_name):
+    """
+    Write the book's unique words to a PDF. Returns the number of rows
+    exported, 0 if the book has no words and None if it isn't in the database.
+    Doesn't touch Tk, so it can run on a job's worker thread or in the worker service.
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.platypus import SimpleDocTemplate, TableStyle
+
+    store = VocabStore(db_path)
+    try:
+        if not store.has_book(book_name):
+            return None
+        # Deduplicated and ordered by SQLite; rows stream from the cursor
+        rows = _CountedRows(store.book_rows(book_name, unique=True))
+        if rows.empty():
+            return 0
+
+        style = ParagraphStyle("VocabCell", fontName=FONT_NAME, fontSize=FONT_SIZE, leading=LEADING)
+        # Whole-row/column ranges only: no per-cell style commands
+        table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTNAME', (0, 1), (-1, -1), FONT_NAME),
+            ('FONTSIZE', (0, 0), (-1, -1), FONT_SIZE),
+            ('LEADING', (0, 0), (-1, -1), LEADING),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), CELL_PAD_Y + 3),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ])
+
+        pdf = SimpleDocTemplate(output_pdf, pagesize=letter)
+        # SimpleDocTemplate's frame has 6pt padding top and bottom
+        pdf.build(_ChunkFeed(_page_tables(iter(rows), pdf.height - 12, style, table_style)))
+    finally:
+        store.close()
+    return rows.count
+
+
+# --- Streaming text exporters ---
+# Each takes an iterator of (word, definition, page_number, book_name) rows
+# and yields output lines, so memory stays flat however large the book is.
+def csv_lines(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in chain([HEADER], rows):
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def jsonl_lines(rows):
+    for word, definition, page_number, book_name in rows:
+        yield json.dumps({"word": word, "definition": definition, "page": page_number, "book": book_name},
+                         ensure_ascii=False) + "\n"
+
+
+def anki_lines(rows):
+    """Front: word, Back: definition (HTML, so line breaks survive), tagged with the book."""
+    yield "#separator:tab\n#html:true\n#tags column:3\n"
+    for word, definition, page_number, book_name in rows:
+        back = html_escape(definition or "").replace("\t", " ").replace("\n", "<br>")
+        yield f"{html_escape(word)}\t{back}\t{book_name.replace(' ', '_')}\n"
+
+
+TEXT_EXPORTERS = {"csv": csv_lines, "jsonl": jsonl_lines, "anki": anki_lines}
+
+
+def export_book(db_path, output_path, book_name, fmt: str = DEFAULT_FORMAT):
+    """
+    Export the book's unique words in the given format. Returns the number
+    of rows exported, 0 if the book has no words and None if it isn't in the
+    database (the same contract as export_word_definitions_to_pdf).
+    """
+    if fmt == "pdf":
+        return export_word_definitions_to_pdf(db_path, output_path, book_name)
+    if fmt not in TEXT_EXPORTERS:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    store = VocabStore(db_path)
+    try:
+        if not store.has_book(book_name):
+            return None
+        rows = _CountedRows(store.book_rows(book_name, unique=True))
+        if rows.empty():
+            return 0
+        with open(output_path, "w", encoding="utf-8", newline="") as f:
+            f.writelines(TEXT_EXPORTERS[fmt](iter(rows)))
+    finally:
+        store.close()
+    return rows.count
+
+
+def export_path(output_dir: str, book_name: str, fmt: str = DEFAULT_FORMAT) -> str:
+    return os.path.join(output_dir, f"{book_name}_definitions{EXPORT_FORMATS[fmt]}")
+
+
+# --- Command line ---
+# Usage: python Export_module.py BOOK [BOOK ...] [--format csv] [--db word/lightsql.db] [--out word]
+if __name__ == "__main__":
+    import argparse
+
+    words_dir = os.path.join(os.getcwd(), "word")
+    parser = argparse.ArgumentParser(description="Export stored word definitions for one or more books.")
+    parser.add_argument("books", nargs="+")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default=DEFAULT_FORMAT)
+    parser.add_argument("--db", default=os.path.join(words_dir, "lightsql.db"))
+    parser.add_argument("--out", default=words_dir, help="output directory")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    failed = False
+    for book_name in args.books:
+        path = export_path(args.out, book_name, args.format)
+        start = time.perf_counter()
+        exported = export_book(args.db, path, book_name, args.format)
+        if exported is None:
+            print(f"{book_name}: not in {args.db}", file=sys.stderr)
+            failed = True
+        elif exported == 0:
+            print(f"{book_name}: no word definitions stored")
+        else:
+            print(f"{book_name}: {exported} words -> {path} ({time.perf_counter() - start:.2f}s)")
+    sys.exit(1 if failed else 0)
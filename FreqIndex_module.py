@@ -0,0 +1,141 @@
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+
+# --- Setup ---
+FREQ_INDEX_DIR = os.path.join(os.getcwd(), "word")
+# Largest rank any caller asks about; indexes are built this deep
+FREQ_INDEX_SIZE = 30000
+
+MAGIC = b"B2WF"
+VERSION = 1
+HEADER = struct.Struct("<4sII")  # magic, version, word count
+
+
+def freq_index_path(lang: str) -> str:
+    return os.path.join(FREQ_INDEX_DIR, f"freq_{lang}.idx")
+
+
+# --- Build step ---
+def build_freq_index(lang: str, n: int = FREQ_INDEX_SIZE, path: str | None = None) -> str:
+    """
+    Write wordfreq's top-n list for a language as a sorted, memory-mappable file:
+    header, (count + 1) uint32 string offsets, count uint32 ranks, UTF-8 blob.
+    """
+    from wordfreq import top_n_list  # only needed when (re)building
+
+    path = path or freq_index_path(lang)
+    ranked = top_n_list(lang, n)
+    entries = sorted((word.encode("utf-8"), rank) for rank, word in enumerate(ranked))
+
+    offsets, ranks, blob = array("I", [0]), array("I"), bytearray()
+    for word, rank in entries:
+        blob += word
+        offsets.append(len(blob))
+        ranks.append(rank)
+    if sys.byteorder != "little":
+        offsets.byteswap()
+        ranks.byteswap()
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(entries)))
+        f.write(offsets.tobytes())
+        f.write(ranks.tobytes())
+        f.write(blob)
+    os.replace(tmp_path, path)
+    return path
+
+
+# --- Lookup API ---
+class FreqIndex:
+    """
+    word -> frequency rank (0 = most frequent) over a memory-mapped index file.
+    Every process maps the same file, so the OS shares one copy of it.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a version {VERSION} frequency index: {path}")
+        self._offsets = memoryview(self.mm)[HEADER.size:HEADER.size + 4 * (self.count + 1)].cast("I")
+        ranks_start = HEADER.size + 4 * (self.count + 1)
+        self._ranks = memoryview(self.mm)[ranks_start:ranks_start + 4 * self.count].cast("I")
+        self._blob = ranks_start + 4 * self.count
+
+    def _word_at(self, i: int) -> bytes:
+        return self.mm[self._blob + self._offsets[i]:self._blob + self._offsets[i + 1]]
+
+    def rank(self, word: str) -> int | None:
+        """Binary search for the word; None if it isn't in the index."""
+        key = word.encode("utf-8")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._word_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self._word_at(lo) == key:
+            return self._ranks[lo]
+        return None
+
+    def within(self, word: str, n: int) -> bool:
+        """True if the word is among the n most frequent."""
+        rank = self.rank(word)
+        return rank is not None and rank < n
+
+    def __contains__(self, word: str) -> bool:
+        return self.rank(word) is not None
+
+    def top(self, n: int) -> "TopWords":
+        return TopWords(self, n)
+
+
+class TopWords:
+    """Set-like view of the n most frequent words: supports `word in top`."""
+
+    def __init__(self, index: FreqIndex, n: int):
+        self.index = index
+        self.n = n
+
+    def __contains__(self, word: str) -> bool:
+        return self.index.within(word, self.n)
+
+
+_indexes = {}
+
+
+def get_freq_index(lang: str) -> FreqIndex:
+    """Map the language's index, building it from wordfreq the first time only."""
+    if lang not in _indexes:
+        path = freq_index_path(lang)
+        try:
+            _indexes[lang] = FreqIndex(path)
+        except (OSError, ValueError):
+            _indexes[lang] = FreqIndex(build_freq_index(lang, path=path))
+    return _indexes[lang]
+
+
+# --- Build from the command line ---
+if __name__ == "__main__":
+    for lang in sys.argv[1:] or ["en", "da"]:
+        start = time.perf_counter()
+        path = build_freq_index(lang)
+        print(f"Built {path} ({os.path.getsize(path) / 1e3:.0f} kB) in {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        index = FreqIndex(path)
+        opened = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(10000):
+            index.rank("hund")
+        per_lookup = (time.perf_counter() - start) / 10000 * 1e6
+        print(f"  opened in {opened * 1e3:.2f} ms, {per_lookup:.1f} µs/lookup, "
+              f"rank('hund')={index.rank('hund')}, rank('the')={index.rank('the')}")
@@ -1,12 +1,10 @@
-from PIL import Image
-import pytesseract
 import jieba
-from wordfreq import top_n_list
-import re
-from collections import Counter
-import spacy
+from FreqIndex_module import get_freq_index
+from LanguageDetect_module import detect_segments, page_language
 from DanishDictionary_module import translate_danish_word, get_danish_lexicon
-nlp_da = spacy.load("da_core_news_sm")  # pip install da_core_news_sm
+from PageOCR_module import ocr_page
+from Lemmatizer_module import get_lemmatizer  # pip install da_core_news_sm
+lemmatizer = get_lemmatizer()
 import sqlite3
 
 from reportlab.lib import colors
@@ -82,96 +80,44 @@ def is_danish_word(word: str):
     Check if a Danish word exists in the dictionary.
     Returns a tuple: (is_valid: bool, lemma: str)
     """
-    doc = nlp_da(word.lower())
-    lemma = doc[0].lemma_ if doc else word.lower()
+    lemma = lemmatizer.lemmatize(word.lower())
     is_valid = lemma in danish_words and len(word) > 2
     return is_valid, lemma
 
-def majority_detection(lemmas_set):
-    lang_votes = {"en": 0, "da": 0, "zh": 0}
-    for w in lemmas_set:
-        lw = w.lower()
-        if lw in english_words:
-            print(lw)
-            lang_votes["en"] += 1
-        elif lw in danish_words:
-            lang_votes["da"] += 1
-        elif re.search(r"[\u4e00-\u9fff]", w):
-            lang_votes["zh"] += 1
-
-    majority_lang = max(lang_votes, key=lang_votes.get)
-
-    print(f"Detected majority language: {majority_lang}\n")
-    return majority_lang
-
-# --- Step 0: Load word lists using wordfreq ---
-english_words = set(top_n_list("en", 30000))
-danish_words = set(top_n_list("da", 30000))
-danish_words_list=list(danish_words)
+# --- Step 0: Load word lists (prebuilt wordfreq rank indexes) ---
+english_words = get_freq_index("en").top(30000)
+danish_words = get_freq_index("da").top(30000)
 # --- Step 1: Open image ---
 page_number=1
 book_name="skammerens_datter"
-img = Image.open("skammerens_datter/skammerens_datter_72.jpg")
-
-# --- Step 2: Detect rotation ---
-try:
-    osd = pytesseract.image_to_osd(img)
-    rotation_angle = int([l for l in osd.split("\n") if "Rotate:" in l][0].split(":")[1].strip())
-except Exception:
-    rotation_angle = 0
-
-if rotation_angle != 0:
-    img = img.rotate(-rotation_angle, expand=True)
-
-# --- Step 3: OCR with multi-language support ---
-ocr_data = pytesseract.image_to_data(
-    img,
-    lang="eng+dan",
-    config="--oem 3 --psm 6",#"--oem 3 --psm 6",
-    output_type=pytesseract.Output.DICT
-)
-
-# --- Step 4: Organize words by line ---
-lines = {}
-all_words = []
-for i, word in enumerate(ocr_data['text']):
-    word = re.sub(r"[^\w\u4e00-\u9fff]", "", word)  # keep alphanumeric + Chinese
-    if word.strip() == "":
-        continue
-
-    line_id = (ocr_data['block_num'][i], ocr_data['par_num'][i], ocr_data['line_num'][i])
-    if line_id not in lines:
-        lines[line_id] = []
-    lines[line_id].append(word)
-    all_words.append(word)
-
-# filter longer words
-filtered_words_for_vote = [w for w in all_words if len(w) > 2]
-nlp = spacy.load("da_core_news_sm")
-doc = nlp(" ".join(filtered_words_for_vote))
-#doc = nlp(filtered_words_for_vote)
-lemmas = [token.lemma_ for token in doc]  # ["gå", "gå", "gå"]
-lemmas_set=set(lemmas)
-
-majority_lang=majority_detection(lemmas_set)
+img_path = "skammerens_datter/skammerens_datter_72.jpg"
+
+# --- Step 2 + 3: Detect rotation and OCR (cached by image hash + settings) ---
+ocr_data = ocr_page(img_path)
+
+# --- Step 4: Detect the language of each line (block/par/line grouping) ---
+segments = detect_segments(ocr_data)
+print(f"Detected page language: {page_language(segments)}\n")
 word_list = []
 
-for word in all_words:
-    if majority_lang == "en":
-        if word.lower() in english_words and len(word) > 2:
-            word_list.append(word)
-    elif majority_lang == "da":
-        if word.lower() in danish_words and len(word) > 2:
-            word_list.append(word)
-    elif majority_lang == "zh":
-        # Use jieba to split Chinese text
-        word_list.extend(jieba.lcut(word))
-    else:
-        continue  # fallback: skip unknown languages
-
-
-top_freq_danish = set(top_n_list("da", 500))
+for line_id, lang, words in segments:
+    for word in words:
+        if lang == "en":
+            if word.lower() in english_words and len(word) > 2:
+                word_list.append(word)
+        elif lang == "da":
+            if word.lower() in danish_words and len(word) > 2:
+                word_list.append(word)
+        elif lang == "zh":
+            # Use jieba to split Chinese text
+            word_list.extend(jieba.lcut(word))
+        else:
+            continue  # fallback: skip unknown languages
+
+
+top_freq_danish = get_freq_index("da").top(500)
 NO_freq_word=True
+lemmatizer.lemmatize_words([w.lower() for w in word_list])  # warm the memo in one batch
 for word_i in list(word_list):
     IsDanish,lemma_i=is_danish_word(word_i)
     #lemma = doc[0].lemma_.lower()
@@ -1,14 +1,13 @@
+import time
+START_TIME = time.perf_counter()
+
 import tkinter as tk
 from tkinter import messagebox, ttk
-import os, re, sqlite3
-from PIL import Image
-import pytesseract, jieba
-from wordfreq import top_n_list
-import spacy
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
-from reportlab.lib import colors
-from DanishDictionary_module import translate_danish_word
+import os, sys, queue, threading, importlib
+from PageOCR_module import DEFAULT_ROTATION, ROTATION_STRATEGIES
+from ImagePreprocess_module import DEFAULT_PRESET, PREPROCESS_PRESETS
+from Worker_service import connect_worker
+from Export_module import DEFAULT_FORMAT, EXPORT_FORMATS
 
 # --- Folders ---
 BOOKS_DIR = os.path.join(os.getcwd(), "book")
@@ -17,69 +16,23 @@ os.makedirs(WORDS_DIR, exist_ok=True)
 
 DB_PATH = os.path.join(WORDS_DIR, "lightsql.db")
 
-# --- Language Resources ---
-nlp_da = spacy.load("da_core_news_sm")
-english_words = set(top_n_list("en", 30000))
-danish_words = set(top_n_list("da", 30000))
-
-
-# --- PDF Export Function ---
-def export_word_definitions_to_pdf(db_path, output_pdf, table_name):
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            f'''
-            SELECT word, definition, page_number, book_name
-            FROM {table_name}
-            ORDER BY page_number ASC, word ASC
-            '''
-        )
-        rows = cursor.fetchall()
-    except sqlite3.OperationalError:
-        messagebox.showwarning("No Data", f"No table found for {table_name}")
-        conn.close()
-        return
-    conn.close()
-
-    if not rows:
-        messagebox.showwarning("No Data", f"No word definitions found in {table_name}")
-        return
-
-    # ✅ Remove duplicates (keep only first occurrence)
-    seen = set()
-    unique_rows = []
-    for word, definition, page_number, book_name in rows:
-        if word not in seen:
-            unique_rows.append((word, definition, page_number, book_name))
-            seen.add(word)
-
-    # Prepare PDF data
-    data = [["Word", "Definition", "Page Number", "Book Name"]] + unique_rows
-    pdf = SimpleDocTemplate(output_pdf, pagesize=letter)
-    table = Table(data, colWidths=[100, 200, 80, 150])
-
-    style = TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ])
-    table.setStyle(style)
-    pdf.build([table])
-
-    messagebox.showinfo("PDF Exported", f"PDF saved to {output_pdf}")
+# How often the UI drains the job's event queue (ms)
+POLL_INTERVAL = 100
+
+# spaCy, jieba, wordfreq indexes, translators etc. live behind this module and
+# are loaded on a background thread once the window is up, unless the warm
+# worker service (Worker_service.py) is running, in which case jobs go there
+PIPELINE_MODULE = "BookPipeline_module"
 
 
 # --- Translator App ---
 class TranslatorApp:
     def __init__(self, root):
         self.root = root
-        self.root.title("Book Translator & PDF")
+        self.root.title("Book Translator & Export")
+        self.job = None
+        self.pipeline = None
+        self.startup_times = {}
 
         # Select book
         tk.Label(root, text="Select Book:").pack()
@@ -90,132 +43,203 @@ class TranslatorApp:
         self.book_menu = tk.OptionMenu(root, self.book_var, *self.book_options)
         self.book_menu.pack()
 
-        # PDF name entry
-        tk.Label(root, text="PDF Name:").pack()
-        self.pdf_entry = tk.Entry(root)
-        self.pdf_entry.pack()
-        if self.book_options:
-            self.pdf_entry.insert(0, f"{self.book_options[0]}_definitions.pdf")
-
-        # Update filename when book changes
-        self.book_var.trace_add("write", self.update_pdf_name)
-
-        # Progress bar
+        # Export format and file name
+        tk.Label(root, text="Export:").pack()
+        export_frame = tk.Frame(root)
+        export_frame.pack()
+        self.format_var = tk.StringVar(value=DEFAULT_FORMAT)
+        tk.OptionMenu(export_frame, self.format_var, *EXPORT_FORMATS).pack(side=tk.LEFT)
+        self.output_entry = tk.Entry(export_frame)
+        self.output_entry.pack(side=tk.LEFT)
+        self.update_output_name()
+
+        # Update filename when book or format changes
+        self.book_var.trace_add("write", self.update_output_name)
+        self.format_var.trace_add("write", self.update_output_name)
+
+        # Progress bar and status line
         self.progress = ttk.Progressbar(root, orient="horizontal", mode="determinate")
         self.progress.pack(fill="x", padx=10, pady=5)
-
-        # Action button
-        tk.Button(root, text="Translate & Create PDF", command=self.translate_and_pdf).pack(pady=10)
+        self.status_var = tk.StringVar(value="Loading language models...")
+        tk.Label(root, textvariable=self.status_var).pack()
+
+        # Page rotation detection and preprocessing for this book
+        rotation_frame = tk.Frame(root)
+        rotation_frame.pack()
+        tk.Label(rotation_frame, text="Rotation:").pack(side=tk.LEFT)
+        self.rotation_var = tk.StringVar(value=DEFAULT_ROTATION)
+        tk.OptionMenu(rotation_frame, self.rotation_var, *ROTATION_STRATEGIES).pack(side=tk.LEFT)
+        tk.Label(rotation_frame, text="Preprocess:").pack(side=tk.LEFT)
+        self.preset_var = tk.StringVar(value=DEFAULT_PRESET)
+        tk.OptionMenu(rotation_frame, self.preset_var, *PREPROCESS_PRESETS).pack(side=tk.LEFT)
+
+        # Only new or changed pages are processed unless this is ticked
+        self.force_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(root, text="Reprocess all pages", variable=self.force_var).pack()
+
+        # Action buttons
+        self.start_btn = tk.Button(root, text="Translate & Export", command=self.translate_and_export)
+        self.start_btn.pack(pady=(10, 2))
+        job_frame = tk.Frame(root)
+        job_frame.pack(pady=(2, 10))
+        self.cancel_btn = tk.Button(job_frame, text="Cancel", command=self.cancel_job, state=tk.DISABLED)
+        self.cancel_btn.pack(side=tk.LEFT, padx=5)
+        self.resume_btn = tk.Button(job_frame, text="Resume", command=self.resume_job, state=tk.DISABLED)
+        self.resume_btn.pack(side=tk.LEFT, padx=5)
+
+        # Load the heavy resources once the window has been drawn
+        self.root.after_idle(self.start_warm_up)
+
+    # ---------- Warm start ----------
+    def start_warm_up(self):
+        self.startup_times["window shown"] = time.perf_counter() - START_TIME
+        threading.Thread(target=self.warm_up, daemon=True).start()
+        self.root.after(POLL_INTERVAL, self.poll_warm_up)
+
+    def warm_up(self):
+        """Runs on a background thread: use the worker service, or import the pipeline and load its models."""
+        try:
+            worker = connect_worker()
+            if worker is not None:
+                self.startup_times["worker connected"] = time.perf_counter() - START_TIME
+                self.pipeline = worker
+                return
+            pipeline = importlib.import_module(PIPELINE_MODULE)
+            self.startup_times["pipeline imported"] = time.perf_counter() - START_TIME
+            pipeline.warm_up()
+            self.startup_times["models ready"] = time.perf_counter() - START_TIME
+            self.pipeline = pipeline
+        except Exception as e:
+            self.warm_up_error = e
+
+    def poll_warm_up(self):
+        if self.pipeline is not None:
+            self.status_var.set("Idle")
+            if "--startup-report" in sys.argv:
+                print(startup_report(self.startup_times))
+        elif getattr(self, "warm_up_error", None) is not None:
+            self.status_var.set("Failed to load language models")
+            messagebox.showerror("Error", str(self.warm_up_error))
+        else:
+            self.root.after(POLL_INTERVAL, self.poll_warm_up)
 
     def get_books(self):
         return sorted([f for f in os.listdir(BOOKS_DIR) if os.path.isdir(os.path.join(BOOKS_DIR, f))])
 
-    def update_pdf_name(self, *args):
+    def update_output_name(self, *args):
         book_name = self.book_var.get().strip()
         if book_name:
-            self.pdf_entry.delete(0, tk.END)
-            self.pdf_entry.insert(0, f"{book_name}_definitions.pdf")
+            self.output_entry.delete(0, tk.END)
+            self.output_entry.insert(0, f"{book_name}_definitions{EXPORT_FORMATS[self.format_var.get()]}")
+
+    def translate_and_export(self):
+        if self.job is not None and self.job.is_running():
+            return
+        if self.pipeline is None:
+            # Clicked before the models finished loading; start as soon as they have
+            if getattr(self, "warm_up_error", None) is None:
+                self.status_var.set("Waiting for language models...")
+                self.root.after(POLL_INTERVAL, self.translate_and_export)
+            return
 
-    def translate_and_pdf(self):
         book_name = self.book_var.get()
         folder_path = os.path.join(BOOKS_DIR, book_name)
         if not os.path.exists(folder_path):
             messagebox.showerror("Error", "Book folder missing")
             return
 
-        pdf_name = self.pdf_entry.get().strip()
-        if not pdf_name.endswith(".pdf"):
-            pdf_name += ".pdf"
-        pdf_path = os.path.join(WORDS_DIR, pdf_name)
-
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-
-        # Each book gets its own table
-        table_name = f"word_definitions_{book_name}"
-        cursor.execute(f'''CREATE TABLE IF NOT EXISTS {table_name}
-                        (word TEXT, definition TEXT, page_number INTEGER, book_name TEXT)''')
-
-        # Collect image files
-        image_files = [f for f in sorted(os.listdir(folder_path)) if f.lower().endswith((".jpg", ".png",".jpeg"))]
-        self.progress["maximum"] = len(image_files)
+        export_format = self.format_var.get()
+        extension = EXPORT_FORMATS[export_format]
+        output_name = self.output_entry.get().strip()
+        if not output_name.endswith(extension):
+            output_name += extension
+        output_path = os.path.join(WORDS_DIR, output_name)
+
+        self.output_path = output_path
+        self.start_job(self.pipeline.start_book_job(book_name, folder_path, DB_PATH, export_path=output_path,
+                                                    export_format=export_format,
+                                                    force=self.force_var.get(), rotation=self.rotation_var.get(),
+                                                    preset=self.preset_var.get()))
+
+    # ---------- Background job ----------
+    def start_job(self, job):
+        self.job = job
         self.progress["value"] = 0
-
-        for filename in image_files:
-            page_number = int(re.findall(r'\d+', filename)[-1])
-            img_path = os.path.join(folder_path, filename)
-            img = Image.open(img_path)
-
-            # Detect rotation
+        self.status_var.set(f"Processing {job.book_name}...")
+        self.start_btn.config(state=tk.DISABLED)
+        self.cancel_btn.config(state=tk.NORMAL)
+        self.resume_btn.config(state=tk.DISABLED)
+        self.root.after(POLL_INTERVAL, self.poll_job)
+
+    def cancel_job(self):
+        if self.job is not None:
+            self.job.cancel()
+            self.status_var.set("Cancelling: saving the pages already looked up...")
+            self.cancel_btn.config(state=tk.DISABLED)
+
+    def resume_job(self):
+        if self.job is not None and not self.job.is_running():
+            self.start_job(self.job.resume())
+
+    def poll_job(self):
+        """Drain progress events from the worker thread; runs on the Tk thread."""
+        while True:
             try:
-                osd = pytesseract.image_to_osd(img)
-                rotation_angle = int([l for l in osd.split("\n") if "Rotate:" in l][0].split(":")[1].strip())
-            except:
-                rotation_angle = 0
-            if rotation_angle != 0:
-                img = img.rotate(-rotation_angle, expand=True)
-
-            # OCR
-            ocr_data = pytesseract.image_to_data(img, lang="eng+dan", config="--oem 3 --psm 6",
-                                                 output_type=pytesseract.Output.DICT)
-            all_words = []
-            for w in ocr_data['text']:
-                w = re.sub(r"[^\w\u4e00-\u9fff]", "", w)
-                if w.strip() != "":
-                    all_words.append(w)
-
-            filtered_words = [w for w in all_words if len(w) > 2]
-            doc = nlp_da(" ".join(filtered_words))
-            lemmas_set = set([token.lemma_ for token in doc])
-
-            # Language detection
-            lang_votes = {"en": 0, "da": 0, "zh": 0}
-            for w in lemmas_set:
-                lw = w.lower()
-                if lw in english_words:
-                    lang_votes["en"] += 1
-                elif lw in danish_words:
-                    lang_votes["da"] += 1
-                elif re.search(r"[\u4e00-\u9fff]", w):
-                    lang_votes["zh"] += 1
-            majority_lang = max(lang_votes, key=lang_votes.get)
-
-            # Collect words
-            word_list = []
-            for word in all_words:
-                if majority_lang == "en" and word.lower() in english_words:
-                    word_list.append(word)
-                elif majority_lang == "da" and word.lower() in danish_words:
-                    word_list.append(word)
-                elif majority_lang == "zh":
-                    word_list.extend(jieba.lcut(word))
-
-            # Translate Danish
-            top_freq_danish = set(top_n_list("da", 500))
-            for word_i in word_list:
-                doc_i = nlp_da(word_i)
-                lemma_i = doc_i[0].lemma_ if doc_i else word_i.lower()
-                is_danish = lemma_i in danish_words and len(word_i) > 2
-                if is_danish and lemma_i not in top_freq_danish:
-                    word_def = translate_danish_word(word_i, speedy=True)
-                    if word_def:
-                        word, definition = word_i, word_def[1]
-                        cursor.execute(
-                            f'SELECT 1 FROM {table_name} WHERE word=? AND book_name=? AND page_number=?',
-                            (word, book_name, page_number))
-                        if cursor.fetchone() is None:
-                            cursor.execute(
-                                f'INSERT INTO {table_name}(word, definition, page_number, book_name) VALUES(?,?,?,?)',
-                                (word, definition, page_number, book_name))
-
-            # Update progress bar
-            self.progress["value"] += 1
-            self.root.update_idletasks()
-
-        conn.commit()
-        conn.close()
-
-        export_word_definitions_to_pdf(DB_PATH, pdf_path, table_name)
+                event = self.job.events.get_nowait()
+            except queue.Empty:
+                break
+            self.handle_event(event)
+
+        if self.job.is_running() or not self.job.events.empty():
+            self.root.after(POLL_INTERVAL, self.poll_job)
+
+    def handle_event(self, event):
+        kind = event["event"]
+        if kind == "started":
+            self.progress["maximum"] = max(event["total"], 1)
+            self.progress["value"] = event["skipped"]
+            if event["skipped"]:
+                self.status_var.set(f"{event['skipped']} unchanged pages skipped")
+        elif kind == "page_read":
+            self.progress["value"] = event["done"]
+            self.status_var.set(f"Reading page {event['page']} ({event['done']}/{event['total']}): "
+                                f"{event['words']} words")
+        elif kind == "resolving":
+            self.status_var.set(f"Looking up {event['resolved']}/{event['lemmas']} words: "
+                                f"{event['store_hits']} already known, {event['cache_hits']} cache hits")
+        elif kind == "page_done":
+            self.status_var.set(f"Saving page {event['page']} ({event['done']}/{event['total']})")
+        elif kind == "cancelled":
+            self.status_var.set(f"Cancelled with {len(self.job.done)} pages saved")
+            self.job_stopped(resumable=True)
+        elif kind == "error":
+            self.status_var.set("Failed")
+            self.job_stopped(resumable=True)
+            messagebox.showerror("Error", event["message"])
+        elif kind == "finished":
+            self.status_var.set("Done")
+            self.job_stopped(resumable=False)
+            exported = event["result"]
+            book_name = event["book"]
+            if exported is None:
+                messagebox.showwarning("No Data", f"No words stored for {book_name}")
+            elif exported == 0:
+                messagebox.showwarning("No Data", f"No word definitions found for {book_name}")
+            else:
+                messagebox.showinfo("Exported", f"{exported} words saved to {self.output_path}")
+
+    def job_stopped(self, resumable):
+        self.start_btn.config(state=tk.NORMAL)
+        self.cancel_btn.config(state=tk.DISABLED)
+        self.resume_btn.config(state=tk.NORMAL if resumable else tk.DISABLED)
+
+
+# --- Startup report ---
+def startup_report(startup_times: dict) -> str:
+    """Milestones since process start (run with --startup-report to print it)."""
+    lines = ["Startup:"]
+    lines += [f"  {name:20s} {seconds:6.2f}s" for name, seconds in startup_times.items()]
+    return "\n".join(lines)
 
 
 # --- Run App ---
@@ -1,10 +1,13 @@
 import tkinter as tk
 from tkinter import messagebox
-import cv2
 import os
+import queue
 from PIL import Image, ImageTk
-import threading
 import shutil  # needed for deleting folders
+from AutoCapture_module import PageTurnDetector
+from CameraPreview_module import (PREVIEW_FPS, STATS_INTERVAL, PreviewPipeline, format_stats,
+                                  open_frame_source)
+from CaptureWriter_module import CAPTURE_FORMATS, DEFAULT_FORMAT, DEFAULT_QUALITY, CaptureWriter, capture_settings
 
 # Language codes for folder naming
 language_codes = {
@@ -16,8 +19,14 @@ language_codes = {
 BOOKS_DIR = os.path.join(os.getcwd(), "book")
 os.makedirs(BOOKS_DIR, exist_ok=True)  # Ensure the book folder exists
 
+# Long-side limits offered for captures ("Full" keeps the camera's resolution)
+MAX_SIDE_CHOICES = ("Full", "3000", "2000", "1600")
+# ms between checks for finished capture writes
+POLL_INTERVAL = 100
+
 class BookScannerApp:
-    def __init__(self, root):
+    def __init__(self, root, source=0, fps=PREVIEW_FPS, capture_format=DEFAULT_FORMAT, quality=None,
+                 grayscale=False, max_side=None):
         self.root = root
         self.root.title("Book Page Scanner")
 
@@ -56,20 +65,62 @@ class BookScannerApp:
         # ---------- Live Preview ----------
         self.video_label = tk.Label(root)
         self.video_label.pack(pady=10)
+        self.photo = None  # one PhotoImage, repainted in place for every frame
+        self.stats_label = tk.Label(root, fg="grey")
+        self.stats_label.pack()
 
         # ---------- Capture Button ----------
         self.capture_btn = tk.Button(root, text="📸 Capture Page", command=self.capture_page, height=2, width=20)
         self.capture_btn.pack(pady=10)
 
+        # ---------- Capture Format ----------
+        # Applied when a capture is written; quality only matters for jpeg and webp
+        format_frame = tk.Frame(root)
+        format_frame.pack(pady=5)
+        tk.Label(format_frame, text="Save as:").pack(side=tk.LEFT, padx=5)
+        self.format_var = tk.StringVar(value=capture_format)
+        tk.OptionMenu(format_frame, self.format_var, *CAPTURE_FORMATS, command=self.on_format_change).pack(side=tk.LEFT)
+        tk.Label(format_frame, text="Quality:").pack(side=tk.LEFT, padx=5)
+        self.quality_var = tk.IntVar(value=quality or DEFAULT_QUALITY.get(capture_format, 90))
+        self.quality_spin = tk.Spinbox(format_frame, from_=1, to=100, width=4, textvariable=self.quality_var)
+        self.quality_spin.pack(side=tk.LEFT)
+        self.grayscale_var = tk.BooleanVar(value=grayscale)
+        tk.Checkbutton(format_frame, text="Grayscale", variable=self.grayscale_var).pack(side=tk.LEFT, padx=5)
+        tk.Label(format_frame, text="Max side:").pack(side=tk.LEFT)
+        self.max_side_var = tk.StringVar(value=str(max_side) if max_side else "Full")
+        tk.OptionMenu(format_frame, self.max_side_var, *MAX_SIDE_CHOICES).pack(side=tk.LEFT)
+        self.on_format_change(capture_format, reset_quality=False)
+
+        # Captures are encoded and written on a background thread
+        self.writer = CaptureWriter()
+
+        # ---------- Auto Capture ----------
+        # Hands-free: capture each page once it has been turned and holds still
+        self.auto_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(root, text="Auto-capture page turns", variable=self.auto_var,
+                       command=self.toggle_auto_capture).pack()
+        self.status_label = tk.Label(root, text="", wraplength=460)
+        self.status_label.pack(pady=5)
+        self.detector = None
+        self.auto_target = None
+        self.auto_saved = {}  # filename of each auto capture, by detector capture index
+
         # ---------- Camera Setup ----------
-        self.cap = cv2.VideoCapture(0)
-        if not self.cap.isOpened():
+        # source is a camera index or a video file standing in for the camera
+        try:
+            frame_source = open_frame_source(source, loop=True)
+        except FileNotFoundError:
+            frame_source = None
+        if frame_source is None or not frame_source.is_opened():
             messagebox.showerror("Error", "Could not open camera")
             self.root.destroy()
             return
 
-        self.cam_running = True
-        self.start_camera_thread()
+        # The preview thread wakes Tk only when a new frame is waiting
+        self.preview = PreviewPipeline(frame_source, fps=fps,
+                                       notify=lambda: self.root.after(0, self.show_preview_frame)).start()
+        self.update_stats()
+        self.poll_writer()
 
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
@@ -123,63 +174,87 @@ class BookScannerApp:
             # Select first book or new book option
             self.book_var.set(self.book_options[0] if self.book_options else "-- New Book --")
 
-    # ---------- Camera Thread ----------
-    def start_camera_thread(self):
-        threading.Thread(target=self.camera_loop, daemon=True).start()
-
-    def camera_loop(self):
-        while self.cam_running:
-            ret, frame = self.cap.read()
-            if ret:
-                frame = cv2.resize(frame, (480, 360))
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                img = Image.fromarray(frame)
-                imgtk = ImageTk.PhotoImage(img)
-                self.video_label.after(0, self.update_label_image, imgtk)
-
-    def update_label_image(self, imgtk):
-        self.video_label.imgtk = imgtk
-        self.video_label.configure(image=imgtk)
+    # ---------- Live Preview ----------
+    # Frames are decoded and scaled on the preview thread; only the newest
+    # one is painted here, on the Tk thread, into the same PhotoImage.
+    def show_preview_frame(self):
+        latest = self.preview.take()
+        if latest is not None:
+            buffer, captured_at = latest
+            height, width = buffer.shape[:2]
+            img = Image.frombuffer("RGB", (width, height), buffer, "raw", "RGB", 0, 1)
+            if self.photo is None:
+                self.photo = ImageTk.PhotoImage(img)
+                self.video_label.configure(image=self.photo)
+            else:
+                self.photo.paste(img)
+            self.preview.release(buffer)
+            self.preview.shown(captured_at)
+
+    def update_stats(self):
+        self.stats_label.configure(text=format_stats(self.preview.stats()))
+        self.root.after(int(STATS_INTERVAL * 1000), self.update_stats)
 
     # ---------- Capture Page ----------
-    def capture_page(self):
+    def capture_target(self):
+        """(book_name, folder_name, is_new) for the selected book and language, or None after an error."""
         # Determine book name
         book_name = self.book_var.get()
         is_new = False
         if book_name == "-- New Book --":
             if self.new_book_entry is None or not self.new_book_entry.get().strip():
                 messagebox.showerror("Error", "Enter a valid book title")
-                return
+                return None
             book_name = self.new_book_entry.get().strip()
             is_new = True
 
-        page_number = self.page_entry.get().strip()
-        lang_code = language_codes[self.language.get()]
-
-        if not page_number.isdigit():
+        if not self.page_entry.get().strip().isdigit():
             messagebox.showerror("Error", "Enter a valid page number")
-            return
+            return None
 
         # Folder name inside book/
-        folder_name = f"{book_name}_{lang_code}"
+        lang_code = language_codes[self.language.get()]
+        return book_name, f"{book_name}_{lang_code}", is_new
+
+    def current_capture_settings(self):
+        try:
+            quality = self.quality_var.get()
+        except tk.TclError:
+            quality = None  # not a number; use the format's default
+        max_side = self.max_side_var.get()
+        return capture_settings(self.format_var.get(), quality=quality, grayscale=self.grayscale_var.get(),
+                                max_side=int(max_side) if max_side.isdigit() else None)
+
+    def save_frame(self, frame, book_name, folder_name, page_number, tag=None):
+        """Queue the frame for writing; the writer picks a free file name (no overwrite)."""
         folder = os.path.join(BOOKS_DIR, folder_name)
-        os.makedirs(folder, exist_ok=True)
+        os.makedirs(folder, exist_ok=True)  # so a new book shows in the dropdown straight away
+        self.writer.submit(frame, folder, f"{book_name}_{page_number}", self.current_capture_settings(), tag=tag)
+
+    def on_format_change(self, fmt, reset_quality=True):
+        lossy = fmt in DEFAULT_QUALITY
+        if lossy and reset_quality:
+            self.quality_var.set(DEFAULT_QUALITY[fmt])
+        self.quality_spin.configure(state=tk.NORMAL if lossy else tk.DISABLED)
 
-        filename = f"{book_name}_{page_number}.jpg"
-        filepath = os.path.join(folder, filename)
+    def next_page(self, page_number):
+        self.page_entry.delete(0, tk.END)
+        self.page_entry.insert(0, str(int(page_number) + 1))
 
-        # Avoid overwrite
-        counter = 1
-        while os.path.exists(filepath):
-            filepath = os.path.join(folder, f"{book_name}_{page_number}_{counter}.jpg")
-            counter += 1
+    def capture_page(self):
+        target = self.capture_target()
+        if target is None:
+            return
+        book_name, folder_name, is_new = target
+        page_number = self.page_entry.get().strip()
 
-        ret, frame = self.cap.read()
-        if ret:
-            cv2.imwrite(filepath, frame)
-            messagebox.showinfo("Saved", f"Saved {os.path.basename(filepath)} in {folder_name}")
-            self.page_entry.delete(0, tk.END)
-            self.page_entry.insert(0, str(int(page_number) + 1))
+        # The newest frame the preview thread decoded; no second read that
+        # would race it for the camera
+        frame = self.preview.latest_frame()
+        if frame is not None:
+            self.save_frame(frame, book_name, folder_name, page_number)
+            self.status_label.configure(text=f"Saving page {page_number}...", fg="black")
+            self.next_page(page_number)
 
             # If new book, update dropdown and select it
             if is_new:
@@ -188,6 +263,77 @@ class BookScannerApp:
         else:
             messagebox.showerror("Error", "Failed to capture image")
 
+    # ---------- Auto Capture ----------
+    def toggle_auto_capture(self):
+        if not self.auto_var.get():
+            self.preview.on_frame = None
+            self.status_label.configure(text="Auto-capture off", fg="black")
+            return
+        # The book is fixed for the session; the page number keeps counting up
+        self.auto_target = self.capture_target()
+        if self.auto_target is None:
+            self.auto_var.set(False)
+            return
+        self.detector = PageTurnDetector()
+        self.auto_saved = {}
+        self.preview.on_frame = self.on_auto_frame
+        self.status_label.configure(text="Auto-capture on: hold each page still after turning it", fg="black")
+
+    def on_auto_frame(self, frame, small, captured_at):
+        # Runs on the preview thread
+        capture = self.detector.feed(frame, small, captured_at)
+        if capture is not None:
+            self.root.after(0, self.save_auto_capture, capture)
+
+    def save_auto_capture(self, capture):
+        if not self.auto_var.get():
+            return
+        book_name, folder_name, is_new = self.auto_target
+        page_number = self.page_entry.get().strip()
+        if not page_number.isdigit():
+            self.auto_var.set(False)
+            self.toggle_auto_capture()
+            self.status_label.configure(text="Auto-capture stopped: enter a valid page number", fg="red")
+            return
+
+        self.save_frame(capture["frame"], book_name, folder_name, page_number,
+                        tag={"index": capture["index"], "duplicate_of": capture["duplicate_of"]})
+        self.next_page(page_number)
+
+        if is_new:
+            self.refresh_book_dropdown(folder_name)
+            self.auto_target = (book_name, folder_name, False)
+
+    # ---------- Capture Writes ----------
+    def poll_writer(self):
+        """Report finished writes in the status line; runs on the Tk thread."""
+        while True:
+            try:
+                event = self.writer.events.get_nowait()
+            except queue.Empty:
+                break
+            self.handle_write_event(event)
+        self.root.after(POLL_INTERVAL, self.poll_writer)
+
+    def handle_write_event(self, event):
+        if event["event"] == "error":
+            self.status_label.configure(text=f"Could not save {event['stem']}: {event['message']}", fg="red")
+            return
+        filename = os.path.basename(event["path"])
+        text = f"Saved {filename} ({event['bytes'] / 1e6:.1f} MB)"
+        pending = self.writer.pending()
+        if pending:
+            text += f", {pending} more being written"
+        tag = event["tag"]
+        if tag is not None:
+            self.auto_saved[tag["index"]] = filename
+            if tag["duplicate_of"] is not None:
+                # Saved anyway; the page probably didn't turn (or turned back)
+                earlier = self.auto_saved.get(tag["duplicate_of"], "an earlier page")
+                self.status_label.configure(text=f"{text}, but it looks like {earlier}", fg="orange")
+                return
+        self.status_label.configure(text=text, fg="black")
+
     # ---------- Refresh book dropdown ----------
     def refresh_book_dropdown(self, new_book_name):
         self.book_options = self.get_existing_books() + ["-- New Book --"]
@@ -212,13 +358,29 @@ class BookScannerApp:
 
     # ---------- Cleanup ----------
     def on_close(self):
-        self.cam_running = False
-        if hasattr(self, "cap") and self.cap.isOpened():
-            self.cap.release()
+        self.auto_var.set(False)
+        if hasattr(self, "preview"):
+            self.preview.stop()
+        if hasattr(self, "writer"):
+            self.writer.close()  # finish writing queued captures
         self.root.destroy()
 
 
+# Usage: python ImageCaptureApple.py [--source 0|video.mp4] [--fps 15]
+#                                    [--format jpeg|png|webp] [--quality 92] [--grayscale] [--max-side 2000]
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Capture book pages from a camera.")
+    parser.add_argument("--source", default="0", help="camera index or a video file to use instead")
+    parser.add_argument("--fps", type=float, default=PREVIEW_FPS, help="preview frame rate cap")
+    parser.add_argument("--format", choices=CAPTURE_FORMATS, default=DEFAULT_FORMAT, help="capture file format")
+    parser.add_argument("--quality", type=int, help="jpeg/webp quality (1-100)")
+    parser.add_argument("--grayscale", action="store_true", help="save captures without colour")
+    parser.add_argument("--max-side", type=int, help="shrink captures to this many pixels on the long side")
+    args = parser.parse_args()
+
     root = tk.Tk()
-    app = BookScannerApp(root)
+    app = BookScannerApp(root, source=args.source, fps=args.fps, capture_format=args.format, quality=args.quality,
+                         grayscale=args.grayscale, max_side=args.max_side)
     root.mainloop()
@@ -0,0 +1,109 @@
+from PIL import Image, ImageChops, ImageFilter
+
+# --- Presets ---
+# draft      - let the JPEG decoder produce a reduced-size image (PIL draft())
+# grayscale  - drop colour before OCR
+# target_dpi - resample so the page is about this many dots per inch wide
+# threshold  - adaptive (local mean) binarisation
+# deskew     - straighten small tilts after rotation detection
+PREPROCESS_PRESETS = {
+    "none": {},
+    "fast": {"draft": True, "grayscale": True, "target_dpi": 200},
+    "standard": {"draft": True, "grayscale": True, "target_dpi": 300, "deskew": True},
+    "binarize": {"draft": True, "grayscale": True, "target_dpi": 300, "threshold": True, "deskew": True},
+}
+DEFAULT_PRESET = "none"
+
+# Phone/webcam captures carry no real DPI; assume a typical paperback page width
+PAGE_WIDTH_INCHES = 5.5
+# Never scale by more than this (up) or less than MIN_SCALE (down)
+MAX_SCALE = 2.0
+MIN_SCALE = 0.25
+
+# Adaptive threshold: neighbourhood radius at 300 DPI and offset below the local mean
+THRESHOLD_RADIUS = 15
+THRESHOLD_OFFSET = 10
+
+# Deskew: search +-DESKEW_RANGE degrees in DESKEW_STEP steps on a small copy
+DESKEW_RANGE = 5.0
+DESKEW_STEP = 0.5
+DESKEW_SIDE = 800
+
+
+def get_preset(name: str) -> dict:
+    if name not in PREPROCESS_PRESETS:
+        raise ValueError(f"Unknown preprocessing preset: {name}")
+    return PREPROCESS_PRESETS[name]
+
+
+def target_size(size: tuple[int, int], target_dpi: int) -> tuple[int, int]:
+    width, height = size
+    scale = min(MAX_SCALE, max(MIN_SCALE, target_dpi * PAGE_WIDTH_INCHES / width))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+# --- Stages ---
+def open_for_preset(img_path: str, preset: str = DEFAULT_PRESET) -> Image.Image:
+    """Open an image, asking the JPEG decoder for a reduced size when the preset allows it."""
+    options = get_preset(preset)
+    img = Image.open(img_path)
+    if options.get("draft") and options.get("target_dpi"):
+        # draft() only picks a DCT scale whose result is still >= the requested size
+        img.draft("L" if options.get("grayscale") else "RGB", target_size(img.size, options["target_dpi"]))
+    return img
+
+
+def adaptive_threshold(img: Image.Image, radius: int = THRESHOLD_RADIUS, offset: int = THRESHOLD_OFFSET) -> Image.Image:
+    """Black where a pixel is darker than its neighbourhood mean by more than offset."""
+    gray = img.convert("L")
+    local_mean = gray.filter(ImageFilter.BoxBlur(radius))
+    darker_by = ImageChops.subtract(local_mean, gray)
+    return darker_by.point(lambda v: 0 if v > offset else 255)
+
+
+def estimate_skew(img: Image.Image) -> float:
+    """
+    Projection-profile skew estimate: the angle at which row darkness varies
+    the most is the one where text lines run horizontally.
+    """
+    small = img.convert("L")
+    small.thumbnail((DESKEW_SIDE, DESKEW_SIDE))
+    small = ImageChops.invert(small)  # text bright, background dark
+
+    best_angle, best_score = 0.0, -1.0
+    steps = int(DESKEW_RANGE / DESKEW_STEP)
+    for i in range(-steps, steps + 1):
+        angle = i * DESKEW_STEP
+        rotated = small.rotate(angle, resample=Image.BILINEAR, expand=False)
+        # Squash to one column: each pixel is its row's mean darkness
+        rows = list(rotated.resize((1, rotated.height), Image.BOX).getdata())
+        mean = sum(rows) / len(rows)
+        score = sum((r - mean) ** 2 for r in rows)
+        if score > best_score:
+            best_angle, best_score = angle, score
+    # A peak at the edge of the range means no clear text lines (or a page
+    # still on its side); leave those alone
+    return 0.0 if abs(best_angle) >= DESKEW_RANGE else best_angle
+
+
+def deskew(img: Image.Image) -> Image.Image:
+    angle = estimate_skew(img)
+    if angle == 0:
+        return img
+    fill = 255 if img.mode in ("L", "1") else (255, 255, 255)
+    return img.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=fill)
+
+
+def preprocess_image(img: Image.Image, preset: str = DEFAULT_PRESET) -> Image.Image:
+    """Grayscale, resample and binarise according to the preset (deskew runs after rotation)."""
+    options = get_preset(preset)
+    if options.get("grayscale"):
+        img = img.convert("L")
+    if options.get("target_dpi"):
+        size = target_size(img.size, options["target_dpi"])
+        if abs(size[0] - img.width) > img.width * 0.1:
+            img = img.resize(size, Image.LANCZOS)
+    if options.get("threshold"):
+        scale = options.get("target_dpi", 300) / 300
+        img = adaptive_threshold(img, radius=max(3, round(THRESHOLD_RADIUS * scale)))
+    return img
@@ -0,0 +1,145 @@
+import math
+import re
+from FreqIndex_module import get_freq_index
+
+# --- Setup ---
+# Languages a segment can be routed to, in score-tuple order
+LANGUAGES = ("en", "da", "zh")
+# Lexicon depth used for scoring (same depth the word filters use)
+LEXICON_SIZE = 30000
+# A lexicon hit counts 1.0 for the most frequent word, falling off with
+# log(rank) to 1 - RANK_FALLOFF at the bottom of the lexicon, so words both
+# lexicons know ("i", "at", "the") lean towards the language they are common in
+RANK_FALLOFF = 0.75
+# Letters that, among our languages, only Danish uses
+DANISH_LETTERS = frozenset("æøå")
+DANISH_LETTER_SCORE = 1.0
+CJK_RE = re.compile(r"[\u4e00-\u9fff]")
+
+# A line needs this much evidence to get its own language; weaker lines
+# (page numbers, one-word headings) take their block's, then the page's
+MIN_SEGMENT_SCORE = 2.0
+# Below this the whole page is treated as unreadable and its words are skipped
+MIN_PAGE_SCORE = 1.0
+
+# Word scores are memoised across pages; drop them past this many words
+MEMO_LIMIT = 200_000
+_word_scores = {}
+
+
+# --- Word scores ---
+def clean_token(word: str) -> str:
+    """Strip punctuation from an OCR token, keeping alphanumerics and Chinese."""
+    return re.sub(r"[^\w\u4e00-\u9fff]", "", word)
+
+
+def _rank_weight(rank: int | None) -> float:
+    if rank is None or rank >= LEXICON_SIZE:
+        return 0.0
+    return 1.0 - RANK_FALLOFF * math.log1p(rank) / math.log1p(LEXICON_SIZE)
+
+
+def score_words(words) -> dict[str, tuple[float, ...]]:
+    """Return {word: (en, da, zh) scores} for the unique words, scoring memo misses in one pass."""
+    misses = [w for w in set(words) if w not in _word_scores]
+    if misses:
+        if len(_word_scores) + len(misses) > MEMO_LIMIT:
+            _word_scores.clear()
+        english, danish = get_freq_index("en"), get_freq_index("da")
+        for word in misses:
+            if CJK_RE.search(word):
+                _word_scores[word] = (0.0, 0.0, 1.0)
+                continue
+            lw = word.lower()
+            # Single letters and digits say nothing about the language
+            if len(lw) < 2 or lw.isdigit():
+                _word_scores[word] = (0.0, 0.0, 0.0)
+                continue
+            da = _rank_weight(danish.rank(lw))
+            if DANISH_LETTERS.intersection(lw):
+                da += DANISH_LETTER_SCORE
+            _word_scores[word] = (_rank_weight(english.rank(lw)), da, 0.0)
+    return {w: _word_scores[w] for w in words}
+
+
+def _total(scores) -> list[float]:
+    total = [0.0] * len(LANGUAGES)
+    for score in scores:
+        for i, s in enumerate(score):
+            total[i] += s
+    return total
+
+
+def _best(total: list[float], min_score: float) -> str | None:
+    best = max(range(len(LANGUAGES)), key=total.__getitem__)
+    return LANGUAGES[best] if total[best] >= min_score else None
+
+
+# --- Segments ---
+def group_lines(ocr_data: dict) -> dict[tuple[int, int, int], list[str]]:
+    """Cleaned OCR words grouped by (block_num, par_num, line_num), in reading order."""
+    lines = {}
+    for i, word in enumerate(ocr_data["text"]):
+        word = clean_token(word)
+        if word.strip() == "":
+            continue
+        line_id = (ocr_data["block_num"][i], ocr_data["par_num"][i], ocr_data["line_num"][i])
+        lines.setdefault(line_id, []).append(word)
+    return lines
+
+
+def detect_segments(ocr_data: dict) -> list[tuple[tuple[int, int, int], str | None, list[str]]]:
+    """
+    Classify each OCR line of a page. Returns (line_id, lang, words) per line;
+    lang is None when neither the line, its block nor the page has any evidence.
+    """
+    lines = group_lines(ocr_data)
+    scores = score_words([w for words in lines.values() for w in words])
+
+    line_totals = {line_id: _total(scores[w] for w in words) for line_id, words in lines.items()}
+    block_lines = {}
+    for (block, _, _), total in line_totals.items():
+        block_lines.setdefault(block, []).append(total)
+    block_totals = {block: _total(totals) for block, totals in block_lines.items()}
+    page_lang = _best(_total(block_totals.values()), MIN_PAGE_SCORE)
+
+    segments = []
+    for line_id, words in lines.items():
+        lang = (_best(line_totals[line_id], MIN_SEGMENT_SCORE)
+                or _best(block_totals[line_id[0]], MIN_SEGMENT_SCORE)
+                or page_lang)
+        segments.append((line_id, lang, words))
+    return segments
+
+
+def page_language(segments) -> str | None:
+    """The language most of the page's words were routed to."""
+    counts = {}
+    for _, lang, words in segments:
+        if lang is not None:
+            counts[lang] = counts.get(lang, 0) + len(words)
+    return max(counts, key=counts.get) if counts else None
+
+
+# --- Example ---
+if __name__ == "__main__":
+    # A Danish page with an English quotation and a footer page number
+    page = [
+        (1, "Han gik langsomt ned ad gaden og tænkte på hende."),
+        (1, "Det var koldt, og vinden kom fra havet."),
+        (2, "\"To be, or not to be, that is the question.\""),
+        (3, "Hun svarede ikke."),
+        (4, "42"),
+    ]
+    ocr_data = {"text": [], "block_num": [], "par_num": [], "line_num": []}
+    for line_num, (block, text) in enumerate(page, 1):
+        for word in text.split():
+            ocr_data["text"].append(word)
+            ocr_data["block_num"].append(block)
+            ocr_data["par_num"].append(1)
+            ocr_data["line_num"].append(line_num)
+
+    segments = detect_segments(ocr_data)
+    for line_id, lang, words in segments:
+        print(f"{str(line_id):12s} {str(lang):4s} {' '.join(words)}")
+    print(f"page language: {page_language(segments)}")
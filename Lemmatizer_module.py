@@ -0,0 +1,77 @@
+import os
+from importlib import metadata
+import spacy
+from TranslationCache_module import CACHE_DIR, TranslationCache
+
+# --- Setup ---
+MODEL_NAME = "da_core_news_sm"
+# Lemmas only need the tagger side of the pipeline
+DISABLED_COMPONENTS = ["parser", "ner"]
+PIPE_BATCH_SIZE = 256
+
+LEMMA_CACHE_PATH = os.path.join(CACHE_DIR, "lemma_cache.db")
+
+
+# --- Lemmatizer ---
+class Lemmatizer:
+    """
+    word -> lemma with an in-process memo in front of a persistent on-disk
+    cache (shared across pages, books and processes). Misses are lemmatised
+    together with nlp.pipe instead of one pipeline run per word.
+    """
+
+    def __init__(self, model_name: str = MODEL_NAME, cache_path: str = LEMMA_CACHE_PATH):
+        self.model_name = model_name
+        self._nlp = None
+        self._backend = None
+        self.memo = {}
+        self.cache = TranslationCache(cache_path)
+
+    @property
+    def nlp(self):
+        if self._nlp is None:
+            self._nlp = spacy.load(self.model_name, disable=DISABLED_COMPONENTS)
+        return self._nlp
+
+    @property
+    def backend(self) -> str:
+        # Cached lemmas are only valid for the model version that produced
+        # them. Read it from the installed package so an all-hits run never
+        # loads the model; a model loaded from a path has only its meta.
+        if self._backend is None:
+            try:
+                version = metadata.version(self.model_name)
+            except (metadata.PackageNotFoundError, ValueError):
+                version = self.nlp.meta.get("version", "")
+            self._backend = f"spacy:{self.model_name}@{version}"
+        return self._backend
+
+    def lemmatize_words(self, words) -> dict[str, str]:
+        """Return {word: lemma} for the unique words, lemmatising each word on its own."""
+        unique = [w for w in dict.fromkeys(words) if w not in self.memo]
+        if unique:
+            backend = self.backend
+            found = self.cache.get_many(backend, "da", "lemma", unique)
+            misses = [w for w in unique if w not in found]
+            if misses:
+                lemmas = {}
+                for word, doc in zip(misses, self.nlp.pipe(misses, batch_size=PIPE_BATCH_SIZE)):
+                    lemmas[word] = doc[0].lemma_ if len(doc) else word.lower()
+                self.cache.put_many(backend, "da", "lemma", lemmas)
+                found.update(lemmas)
+            self.memo.update(found)
+        return {w: self.memo[w] for w in words}
+
+    def lemmatize(self, word: str) -> str:
+        return self.lemmatize_words([word])[word]
+
+
+_lemmatizer = None
+
+
+def get_lemmatizer() -> Lemmatizer:
+    """Return the process-wide lemmatizer; the model loads on first use."""
+    global _lemmatizer
+    if _lemmatizer is None:
+        _lemmatizer = Lemmatizer()
+    return _lemmatizer
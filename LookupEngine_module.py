@@ -0,0 +1,100 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Defaults ---
+MAX_IN_FLIGHT = 8
+REQUESTS_PER_SECOND = 10.0
+RETRIES = 3
+BACKOFF = 0.5
+MAX_BACKOFF = 8.0
+
+
+# --- Rate limiting ---
+class TokenBucket:
+    """Thread-safe token bucket: allows `rate` calls per second with bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: int | None = None):
+        self.rate = rate
+        self.capacity = capacity or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+# --- Concurrent lookups ---
+class LookupEngine:
+    """
+    Runs blocking lookups (HTTP requests, translator calls) on a thread pool
+    with a bounded number in flight, a shared token-bucket rate limit and
+    retry with exponential backoff for transient errors.
+    """
+
+    def __init__(self, max_in_flight: int = MAX_IN_FLIGHT, rate: float | None = REQUESTS_PER_SECOND,
+                 burst: int | None = None, retries: int = RETRIES, backoff: float = BACKOFF,
+                 max_backoff: float = MAX_BACKOFF, should_retry=None):
+        self.max_in_flight = max_in_flight
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.should_retry = should_retry or (lambda exc: True)
+        self.calls = 0
+        self.retried = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def call(self, func, *args):
+        """Call func(*args) under the rate limit, retrying transient failures."""
+        for attempt in range(self.retries + 1):
+            if self.bucket is not None:
+                self.bucket.acquire()
+            with self._lock:
+                self.calls += 1
+            try:
+                return func(*args)
+            except Exception as e:
+                if attempt == self.retries or not self.should_retry(e):
+                    with self._lock:
+                        self.failed += 1
+                    raise
+            with self._lock:
+                self.retried += 1
+            delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+            time.sleep(delay * random.uniform(0.5, 1.0))
+
+    def map(self, func, items) -> list:
+        """
+        Apply func to every item concurrently and return the results in input
+        order. An item whose call ultimately failed yields its exception.
+        """
+        items = list(items)
+        if not items:
+            return []
+        if len(items) == 1 or self.max_in_flight <= 1:
+            return [self._safe_call(func, item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.max_in_flight, len(items))) as pool:
+            return list(pool.map(lambda item: self._safe_call(func, item), items))
+
+    def _safe_call(self, func, item):
+        try:
+            return self.call(func, item)
+        except Exception as e:
+            return e
+
+    def stats(self) -> dict[str, int]:
+        return {"calls": self.calls, "retried": self.retried, "failed": self.failed}
+
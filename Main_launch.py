@@ -2,6 +2,8 @@ import tkinter as tk
 import subprocess
 import sys
 import os
+import threading
+from Worker_service import ensure_worker
 
 def run_scanner():
     """Run the Book Scanner GUI"""
@@ -26,6 +28,9 @@ class MainLauncher:
         tk.Button(root, text="📸 Book Scanner", width=20, height=2, command=run_scanner).pack(pady=10)
         tk.Button(root, text="🌍 Translator & PDF", width=20, height=2, command=run_translator).pack(pady=10)
 
+        # Start (or reuse) the warm worker so the translator doesn't load models on every click
+        threading.Thread(target=ensure_worker, daemon=True).start()
+
 if __name__ == "__main__":
     root = tk.Tk()
     app = MainLauncher(root)
@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+# --- Setup ---
+OCR_CACHE_DIR = os.path.join(os.getcwd(), "word")
+OCR_CACHE_PATH = os.path.join(OCR_CACHE_DIR, "ocr_cache.db")
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# --- Columnar encoding ---
+def encode_ocr_data(ocr_data: dict) -> bytes:
+    """
+    Tesseract's Output.DICT is already column-oriented (one list per field),
+    so store it as-is: compact JSON, zlib-compressed.
+    """
+    return zlib.compress(json.dumps(ocr_data, separators=(",", ":"), ensure_ascii=False).encode("utf-8"), 6)
+
+
+def decode_ocr_data(blob: bytes) -> dict:
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+# --- Content-addressed OCR cache ---
+class OCRCache:
+    """
+    Stores full OCR results keyed by (image SHA-256, OCR settings), so any
+    stage after OCR can be rerun without calling Tesseract again. Safe to use
+    from several threads and worker processes at once (WAL mode, one
+    connection per thread and process).
+    """
+
+    def __init__(self, path: str = OCR_CACHE_PATH):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute('''CREATE TABLE IF NOT EXISTS ocr_results (
+                                 image_sha256 TEXT NOT NULL,
+                                 settings TEXT NOT NULL,
+                                 data BLOB NOT NULL,
+                                 created REAL NOT NULL,
+                                 PRIMARY KEY (image_sha256, settings)
+                             ) WITHOUT ROWID''')
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        # A pool worker forked from a process that already used the cache
+        # inherits its thread-local; never share that connection across the fork
+        if getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return self._local.conn
+
+    def get(self, image_sha256: str, settings: str) -> dict | None:
+        row = self._conn().execute('SELECT data FROM ocr_results WHERE image_sha256=? AND settings=?',
+                                (image_sha256, settings)).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return decode_ocr_data(row[0])
+
+    def put(self, image_sha256: str, settings: str, ocr_data: dict):
+        conn = self._conn()
+        with conn:
+            conn.execute('INSERT OR REPLACE INTO ocr_results VALUES(?,?,?,?)',
+                              (image_sha256, settings, encode_ocr_data(ocr_data), time.time()))
+
+    def stats(self) -> dict[str, int]:
+        entries = self._conn().execute('SELECT COUNT(*) FROM ocr_results').fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+
+_ocr_cache = None
+
+
+def get_ocr_cache() -> OCRCache:
+    """Return this process's cache, opening it on first use."""
+    global _ocr_cache
+    if _ocr_cache is None:
+        _ocr_cache = OCRCache()
+    return _ocr_cache
@@ -0,0 +1,164 @@
+import os
+import re
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from PIL import Image, ImageOps
+import pytesseract
+from OCRCache_module import file_sha256, get_ocr_cache
+from ImagePreprocess_module import DEFAULT_PRESET, deskew, get_preset, open_for_preset, preprocess_image
+
+# --- Setup ---
+OCR_LANG = "eng+dan"
+OCR_CONFIG = "--oem 3 --psm 6"
+IMAGE_EXTENSIONS = (".jpg", ".png", ".jpeg", ".webp")
+
+# Worker processes for page OCR (defaults to the core count)
+OCR_WORKERS = os.cpu_count() or 1
+
+# Rotation detection strategies:
+#   osd       - Tesseract OSD on the full image, then OCR (two full passes)
+#   osd_small - OSD on a downscaled grayscale copy, then OCR
+#   auto      - OCR first; only run OSD (downscaled) if the result looks unreadable
+#   exif      - trust the camera's EXIF orientation, no OSD
+#   none      - OCR the image as stored
+ROTATION_STRATEGIES = ("osd", "osd_small", "auto", "exif", "none")
+DEFAULT_ROTATION = "osd"
+
+# Long side of the copy OSD runs on for osd_small/auto
+OSD_MAX_SIDE = 1600
+# auto: accept the first pass if its mean word confidence reaches this
+AUTO_MIN_CONF = 60
+AUTO_MIN_WORDS = 10
+
+
+def ocr_settings(rotation: str = DEFAULT_ROTATION, preset: str = DEFAULT_PRESET) -> str:
+    """Everything that affects OCR output, used as part of the OCR cache key."""
+    settings = f"lang={OCR_LANG}|config={OCR_CONFIG}|rotation={rotation}"
+    # Keep keys from before preprocessing existed valid for the unprocessed path
+    return settings if preset == DEFAULT_PRESET else f"{settings}|preprocess={preset}"
+
+
+# --- Single page ---
+def page_number_from_filename(filename: str) -> int:
+    """Take the last number in the file name as the page number."""
+    numbers = re.findall(r'\d+', filename)
+    return int(numbers[-1]) if numbers else 0
+
+
+def list_page_images(folder_path: str) -> list[str]:
+    return [f for f in sorted(os.listdir(folder_path)) if f.lower().endswith(IMAGE_EXTENSIONS)]
+
+
+def detect_rotation(img: Image.Image) -> int:
+    """Return the clockwise rotation Tesseract OSD reports, or 0 if it can't tell."""
+    try:
+        osd = pytesseract.image_to_osd(img)
+        return int([l for l in osd.split("\n") if "Rotate:" in l][0].split(":")[1].strip())
+    except (pytesseract.TesseractError, IndexError, ValueError):
+        # Typically "Too few characters" on sparse pages
+        return 0
+
+
+def detect_rotation_small(img: Image.Image) -> int:
+    """Run OSD on a downscaled grayscale copy; orientation survives the resize."""
+    small = img.convert("L")
+    small.thumbnail((OSD_MAX_SIDE, OSD_MAX_SIDE))
+    return detect_rotation(small)
+
+
+def mean_confidence(ocr_data: dict) -> tuple[float, int]:
+    """Mean confidence over recognised words, and how many there were."""
+    confs = [float(c) for c, t in zip(ocr_data["conf"], ocr_data["text"]) if float(c) >= 0 and t.strip()]
+    return (sum(confs) / len(confs) if confs else 0.0), len(confs)
+
+
+def _run_ocr(img: Image.Image) -> dict:
+    return pytesseract.image_to_data(img, lang=OCR_LANG, config=OCR_CONFIG,
+                                     output_type=pytesseract.Output.DICT)
+
+
+def _rotated(img: Image.Image, rotation_angle: int) -> Image.Image:
+    return img.rotate(-rotation_angle, expand=True) if rotation_angle != 0 else img
+
+
+def ocr_image(img: Image.Image, rotation: str = DEFAULT_ROTATION, preset: str = DEFAULT_PRESET) -> dict:
+    """
+    Preprocess the image with the named preset, undo its rotation with the
+    chosen strategy and return Tesseract's Output.DICT.
+    """
+    if rotation not in ROTATION_STRATEGIES:
+        raise ValueError(f"Unknown rotation strategy: {rotation}")
+
+    # EXIF orientation is free to honour and a no-op for images without it
+    if rotation != "none":
+        img = ImageOps.exif_transpose(img)
+    img = preprocess_image(img, preset)
+
+    if get_preset(preset).get("deskew"):
+        return _ocr_rotated(img, rotation, lambda page: _run_ocr(deskew(page)))
+    return _ocr_rotated(img, rotation, _run_ocr)
+
+
+def _ocr_rotated(img: Image.Image, rotation: str, run) -> dict:
+    if rotation == "osd":
+        return run(_rotated(img, detect_rotation(img)))
+    if rotation == "osd_small":
+        return run(_rotated(img, detect_rotation_small(img)))
+    if rotation == "auto":
+        ocr_data = run(img)
+        conf, words = mean_confidence(ocr_data)
+        if conf >= AUTO_MIN_CONF and words >= AUTO_MIN_WORDS:
+            return ocr_data
+        rotation_angle = detect_rotation_small(img)
+        if rotation_angle == 0:
+            return ocr_data
+        rotated_data = run(_rotated(img, rotation_angle))
+        return rotated_data if mean_confidence(rotated_data) >= (conf, words) else ocr_data
+    return run(img)
+
+
+def ocr_page(img_path: str, rotation: str = DEFAULT_ROTATION, preset: str = DEFAULT_PRESET,
+             use_cache: bool = True) -> dict:
+    """OCR a page image, reusing a cached result for identical image bytes and settings."""
+    if not use_cache:
+        return ocr_image(open_for_preset(img_path, preset), rotation, preset)
+
+    cache = get_ocr_cache()
+    image_sha256 = file_sha256(img_path)
+    settings = ocr_settings(rotation, preset)
+    ocr_data = cache.get(image_sha256, settings)
+    if ocr_data is None:
+        ocr_data = ocr_image(open_for_preset(img_path, preset), rotation, preset)
+        cache.put(image_sha256, settings, ocr_data)
+    return ocr_data
+
+
+# --- Many pages ---
+def _init_worker():
+    # Each tesseract call would otherwise spin up one OpenMP thread per core,
+    # oversubscribing the CPU once pages run in parallel
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    # Ctrl-C reaches the whole process group; let the parent decide when to stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def ocr_pages(img_paths: list[str], workers: int | None = None, rotation: str = DEFAULT_ROTATION,
+              preset: str = DEFAULT_PRESET, use_cache: bool = True):
+    """
+    OCR pages across a pool of worker processes.
+    Yields (img_path, ocr_data) in the same order as img_paths.
+    """
+    workers = workers or OCR_WORKERS
+    run = partial(ocr_page, rotation=rotation, preset=preset, use_cache=use_cache)
+    if workers <= 1 or len(img_paths) <= 1:
+        for img_path in img_paths:
+            yield img_path, run(img_path)
+        return
+
+    pool = ProcessPoolExecutor(max_workers=min(workers, len(img_paths)), initializer=_init_worker)
+    try:
+        yield from zip(img_paths, pool.map(run, img_paths))
+    finally:
+        # If the caller stops early (e.g. a cancelled job), drop the queued pages
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,163 @@
+import os
+import sqlite3
+import threading
+import time
+
+# --- Setup ---
+# One cache file shared by every entry point (GUI, scripts, launcher subprocesses)
+CACHE_DIR = os.path.join(os.getcwd(), "word")
+CACHE_PATH = os.path.join(CACHE_DIR, "translation_cache.db")
+
+DEFAULT_MAX_ENTRIES = 200_000
+DEFAULT_TTL = None  # seconds; None keeps entries until evicted by size
+
+# Only refresh last_used on a hit if it is older than this, to keep reads cheap
+TOUCH_INTERVAL = 3600
+# Check the size bound every N writes instead of on every put
+EVICT_EVERY = 500
+
+
+# --- On-disk translation cache ---
+class TranslationCache:
+    """
+    SQLite-backed cache keyed by (backend, source lang, target lang, text).
+
+    Safe for several processes and threads: the database runs in WAL mode and
+    each thread gets its own connection. Entries are evicted least recently
+    used first once max_entries is exceeded, and expire after ttl seconds.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 ttl: float | None = DEFAULT_TTL):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute('''CREATE TABLE IF NOT EXISTS translations (
+                            backend TEXT NOT NULL,
+                            source TEXT NOT NULL,
+                            target TEXT NOT NULL,
+                            text TEXT NOT NULL,
+                            value TEXT,
+                            created REAL NOT NULL,
+                            last_used REAL NOT NULL,
+                            PRIMARY KEY (backend, source, target, text)
+                        ) WITHOUT ROWID''')
+        conn.execute('CREATE INDEX IF NOT EXISTS translations_last_used ON translations(last_used)')
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, backend: str, source: str, target: str, text: str) -> tuple[bool, str | None]:
+        """Return (hit, value). A hit may carry None for a cached negative result."""
+        conn = self._conn()
+        row = conn.execute(
+            'SELECT value, created, last_used FROM translations '
+            'WHERE backend=? AND source=? AND target=? AND text=?',
+            (backend, source, target, text)).fetchone()
+        now = time.time()
+        if row is None or (self.ttl is not None and now - row[1] > self.ttl):
+            with self._lock:
+                self.misses += 1
+            return False, None
+
+        if now - row[2] > TOUCH_INTERVAL:
+            try:
+                conn.execute(
+                    'UPDATE translations SET last_used=? '
+                    'WHERE backend=? AND source=? AND target=? AND text=?',
+                    (now, backend, source, target, text))
+                conn.commit()
+            except sqlite3.OperationalError:
+                pass  # another writer holds the lock; recency is best effort
+        with self._lock:
+            self.hits += 1
+        return True, row[0]
+
+    def get_many(self, backend: str, source: str, target: str, texts) -> dict[str, str | None]:
+        """Return {text: value} for the texts that are cached; misses are left out."""
+        found = {}
+        for text in texts:
+            hit, value = self.get(backend, source, target, text)
+            if hit:
+                found[text] = value
+        return found
+
+    def put(self, backend: str, source: str, target: str, text: str, value: str | None):
+        self.put_many(backend, source, target, {text: value})
+
+    def put_many(self, backend: str, source: str, target: str, items: dict[str, str | None]):
+        if not items:
+            return
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO translations(backend, source, target, text, value, created, last_used) '
+                'VALUES(?,?,?,?,?,?,?)',
+                [(backend, source, target, text, value, now, now) for text, value in items.items()])
+        with self._lock:
+            self._writes += len(items)
+            due = self._writes >= EVICT_EVERY
+            if due:
+                self._writes = 0
+        if due:
+            self.evict()
+
+    def evict(self):
+        """Drop expired entries, then the least recently used ones above max_entries."""
+        conn = self._conn()
+        with conn:
+            if self.ttl is not None:
+                conn.execute('DELETE FROM translations WHERE created < ?', (time.time() - self.ttl,))
+            count = conn.execute('SELECT COUNT(*) FROM translations').fetchone()[0]
+            excess = count - self.max_entries
+            if excess > 0:
+                # Trim a little below the bound so we don't evict on every write
+                excess += self.max_entries // 10
+                conn.execute(
+                    'DELETE FROM translations WHERE (backend, source, target, text) IN '
+                    '(SELECT backend, source, target, text FROM translations ORDER BY last_used LIMIT ?)',
+                    (excess,))
+
+    def clear(self):
+        conn = self._conn()
+        with conn:
+            conn.execute('DELETE FROM translations')
+
+    def stats(self) -> dict[str, int]:
+        entries = self._conn().execute('SELECT COUNT(*) FROM translations').fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+
+# --- Shared instance ---
+_default_cache = None
+
+
+def get_cache() -> TranslationCache:
+    """Return the process-wide cache, opening it on first use."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = TranslationCache()
+    return _default_cache
+
+
+# --- Example usage ---
+if __name__ == "__main__":
+    cache = get_cache()
+    print("Cache file:", cache.path)
+    print("Stats:", cache.stats())
@@ -0,0 +1,214 @@
+import os
+import sqlite3
+
+# --- Setup ---
+# Bump (and add a step to migrate()) when the schema changes
+SCHEMA_VERSION = 2
+# Per-book tables written before the shared schema existed
+LEGACY_TABLE_PREFIX = "word_definitions_"
+# Headwords per IN (...) lookup, under SQLite's bound-parameter limit
+LOOKUP_CHUNK = 500
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS books (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    book_id INTEGER NOT NULL REFERENCES books(id),
+    page_number INTEGER NOT NULL,
+    UNIQUE (book_id, page_number)
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    headword TEXT NOT NULL UNIQUE,
+    definition TEXT
+);
+CREATE TABLE IF NOT EXISTS occurrences (
+    page_id INTEGER NOT NULL REFERENCES pages(id),
+    entry_id INTEGER NOT NULL REFERENCES entries(id),
+    word TEXT NOT NULL,
+    PRIMARY KEY (page_id, entry_id, word)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS occurrences_entry ON occurrences(entry_id);
+'''
+
+
+# --- Vocabulary store ---
+class VocabStore:
+    """
+    Books, pages, entries (headword -> definition) and the occurrences that
+    link a word on a page to its entry, in one indexed schema. Entries are
+    shared by the whole library, so a headword is translated once ever. Every write is
+    an upsert against a UNIQUE key, so storing a page costs the same
+    however many books are already in the database.
+    """
+
+    def __init__(self, db_path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+        self.migrate()
+
+    def close(self):
+        self.conn.close()
+
+    # --- Migration ---
+    def legacy_tables(self) -> list[str]:
+        return [row[0] for row in self.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name LIKE ? ESCAPE '\\'",
+            (LEGACY_TABLE_PREFIX.replace("_", "\\_") + "%",))]
+
+    def migrate(self) -> int:
+        """
+        Bring the database up to SCHEMA_VERSION:
+            1: copy rows from the old per-book word_definitions_<book> tables
+               into the shared schema (the old tables are left in place)
+            2: re-key the copied surface words under their lemmas
+        Returns the number of legacy rows copied.
+        """
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return 0
+        copied = 0
+        with self.conn:
+            if version < 1:
+                copied = self._copy_legacy_tables()
+                version = 1
+            if version < 2:
+                try:
+                    self._rekey_legacy_entries()
+                    version = 2
+                except (ImportError, OSError):
+                    pass  # no spaCy model here: stay at 1 and re-key on a later open
+            self.conn.execute(f"PRAGMA user_version={version}")
+        return copied
+
+    def _copy_legacy_tables(self) -> int:
+        copied = 0
+        for table in self.legacy_tables():
+            rows = self.conn.execute(
+                f'SELECT word, definition, page_number, book_name FROM "{table}" '
+                'WHERE word IS NOT NULL').fetchall()
+            by_page = {}
+            for word, definition, page_number, book_name in rows:
+                book_name = book_name or table[len(LEGACY_TABLE_PREFIX):]
+                by_page.setdefault((book_name, page_number or 0), {})[word] = definition
+            for (book_name, page_number), word_defs in by_page.items():
+                self.add_definitions(self.page_id(self.book_id(book_name), page_number), word_defs)
+            copied += len(rows)
+        return copied
+
+    def _rekey_legacy_entries(self) -> int:
+        """
+        Entries are keyed by lowercased lemma (BookPipeline_module.danish_candidates),
+        but legacy rows were copied in under their surface words ("Tøs"). Move
+        each onto its lemma's entry, keeping a definition the lemma already has.
+        Returns the number of entries moved.
+        """
+        legacy_words = set()
+        for table in self.legacy_tables():
+            legacy_words.update(row[0] for row in self.conn.execute(
+                f'SELECT DISTINCT word FROM "{table}" WHERE word IS NOT NULL'))
+        entries = {headword: (entry_id, definition) for headword, entry_id, definition
+                   in self.conn.execute("SELECT headword, id, definition FROM entries")
+                   if headword in legacy_words}
+        if not entries:
+            return 0
+
+        from Lemmatizer_module import get_lemmatizer  # spaCy: only for databases with legacy rows
+        lemmas = get_lemmatizer().lemmatize_words(list(entries))
+        moved = 0
+        for headword, (entry_id, definition) in entries.items():
+            lemma = lemmas[headword].lower()
+            if lemma == headword:
+                continue
+            self.conn.execute("INSERT OR IGNORE INTO entries(headword, definition) VALUES(?,?)", (lemma, definition))
+            lemma_id = self.conn.execute("SELECT id FROM entries WHERE headword=?", (lemma,)).fetchone()[0]
+            # An occurrence already linked to the lemma stays as it is
+            self.conn.execute("UPDATE OR IGNORE occurrences SET entry_id=? WHERE entry_id=?", (lemma_id, entry_id))
+            self.conn.execute("DELETE FROM occurrences WHERE entry_id=?", (entry_id,))
+            self.conn.execute("DELETE FROM entries WHERE id=?", (entry_id,))
+            moved += 1
+        return moved
+
+    # --- Writes ---
+    def book_id(self, book_name: str) -> int:
+        self.conn.execute("INSERT OR IGNORE INTO books(name) VALUES(?)", (book_name,))
+        return self.conn.execute("SELECT id FROM books WHERE name=?", (book_name,)).fetchone()[0]
+
+    def page_id(self, book_id: int, page_number: int) -> int:
+        self.conn.execute("INSERT OR IGNORE INTO pages(book_id, page_number) VALUES(?,?)", (book_id, page_number))
+        return self.conn.execute("SELECT id FROM pages WHERE book_id=? AND page_number=?",
+                                 (book_id, page_number)).fetchone()[0]
+
+    def clear_page(self, page_id: int):
+        """Forget a page's occurrences (before storing a reprocessed page)."""
+        self.conn.execute("DELETE FROM occurrences WHERE page_id=?", (page_id,))
+
+    def add_entries(self, definitions: dict[str, str]):
+        """Store {headword: definition} in the library-wide entries, replacing older definitions."""
+        self.conn.executemany(
+            "INSERT INTO entries(headword, definition) VALUES(?,?) "
+            "ON CONFLICT(headword) DO UPDATE SET definition=excluded.definition",
+            definitions.items())
+
+    def add_occurrences(self, page_id: int, headwords: dict[str, str]):
+        """Link {word: headword} on a page to the headwords' entries (which must exist)."""
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO occurrences(page_id, entry_id, word) "
+            "SELECT ?, id, ? FROM entries WHERE headword=?",
+            ((page_id, word, headword) for word, headword in headwords.items()))
+
+    def add_definitions(self, page_id: int, word_defs: dict[str, str]):
+        """Store {word: definition} for a page, each word being its own headword."""
+        self.add_entries(word_defs)
+        self.add_occurrences(page_id, {word: word for word in word_defs})
+
+    def commit(self):
+        self.conn.commit()
+
+    # --- Reads ---
+    def definitions(self, headwords) -> dict[str, str | None]:
+        """Return {headword: definition} for the headwords already stored; unknown ones are left out."""
+        headwords = list(dict.fromkeys(headwords))
+        found = {}
+        for i in range(0, len(headwords), LOOKUP_CHUNK):
+            chunk = headwords[i:i + LOOKUP_CHUNK]
+            found.update(self.conn.execute(
+                f"SELECT headword, definition FROM entries WHERE headword IN ({','.join('?' * len(chunk))})",
+                chunk))
+        return found
+
+    def has_book(self, book_name: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM books WHERE name=?", (book_name,)).fetchone() is not None
+
+    def book_rows(self, book_name: str, unique: bool = False) -> sqlite3.Cursor:
+        """
+        (word, definition, page_number, book_name) for every occurrence in the
+        book, ordered by page then word; with unique, only each word's first
+        occurrence. Rows stream from the returned cursor.
+        """
+        if not unique:
+            return self.conn.execute(
+                '''SELECT o.word, e.definition, p.page_number, b.name
+                   FROM books b
+                   JOIN pages p ON p.book_id = b.id
+                   JOIN occurrences o ON o.page_id = p.id
+                   JOIN entries e ON e.id = o.entry_id
+                   WHERE b.name = ?
+                   ORDER BY p.page_number ASC, o.word ASC''', (book_name,))
+        # SQLite takes the bare columns of a MIN() aggregate from the minimum row
+        return self.conn.execute(
+            '''SELECT o.word, e.definition, MIN(p.page_number) AS first_page, b.name
+               FROM books b
+               JOIN pages p ON p.book_id = b.id
+               JOIN occurrences o ON o.page_id = p.id
+               JOIN entries e ON e.id = o.entry_id
+               WHERE b.name = ?
+               GROUP BY o.word
+               ORDER BY first_page ASC, o.word ASC''', (book_name,))
@@ -0,0 +1,345 @@
+import os
+import sys
+import time
+import ctypes
+import ctypes.util
+import select
+import signal
+import struct
+import argparse
+import threading
+from PIL import Image
+from Batch_process import BOOKS_DIR, EXIT_USAGE, Progress, add_pipeline_options, describe, find_books, load_pipeline, run_book
+from PageOCR_module import IMAGE_EXTENSIONS, list_page_images
+
+# --- Setup ---
+# Watches the scanner's book/<title>_<lang>/ folders and pushes each new or
+# changed page through OCR -> filter -> translate -> store -> export as soon
+# as it is completely written.
+
+# A page counts as written once its size and mtime stop changing for this long
+SETTLE_SECONDS = 1.5
+# Polling fallback: seconds between folder scans
+POLL_INTERVAL = 2.0
+# How often to re-stat pages still settling, and the longest the loop sleeps
+CHECK_INTERVAL = 0.25
+MAX_WAIT = 1.0
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+# struct inotify_event: wd, mask, cookie, len, then len bytes of name
+EVENT_HEADER = struct.Struct("iIII")
+READ_SIZE = 64 * 1024
+
+
+def is_page_image(filename: str) -> bool:
+    return filename.lower().endswith(IMAGE_EXTENSIONS) and not filename.startswith(".")
+
+
+def library_images(root: str) -> set[str]:
+    """Every page image in the book folders directly under root."""
+    paths = set()
+    for name in os.listdir(root):
+        folder = os.path.join(root, name)
+        if not os.path.isdir(folder):
+            continue
+        try:
+            paths.update(os.path.join(folder, f) for f in list_page_images(folder))
+        except FileNotFoundError:
+            pass  # removed while scanning
+    return paths
+
+
+# --- Watchers ---
+# Both report candidate pages: image paths in a book folder that were created
+# or written to. Whether they are finished is up to the Debouncer.
+class InotifyWatcher:
+    """Linux inotify on the library folder and each book folder (via ctypes, no extra dependency)."""
+
+    method = "inotify"
+
+    def __init__(self, root: str):
+        self.root = root
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self.folders = {}  # watch descriptor -> folder
+        self._add_watch(root)
+        for name in sorted(os.listdir(root)):
+            folder = os.path.join(root, name)
+            if os.path.isdir(folder):
+                self._add_watch(folder)
+
+    def _add_watch(self, folder: str):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(folder), WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), folder)
+        self.folders[wd] = folder
+
+    def changes(self, timeout: float) -> set[str]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, READ_SIZE)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = os.fsdecode(data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0"))
+            offset += EVENT_HEADER.size + length
+            if mask & IN_Q_OVERFLOW:
+                # The kernel dropped events: fall back to a full scan
+                changed |= library_images(self.root)
+                continue
+            if mask & IN_IGNORED:
+                self.folders.pop(wd, None)
+                continue
+            folder = self.folders.get(wd)
+            if folder is None or not name:
+                continue
+            path = os.path.join(folder, name)
+            if mask & IN_ISDIR:
+                if folder == self.root:
+                    # A new book: watch it, and take the pages that landed before the watch did
+                    try:
+                        self._add_watch(path)
+                        changed.update(os.path.join(path, f) for f in list_page_images(path))
+                    except OSError:
+                        pass  # already gone
+                continue
+            if folder != self.root and is_page_image(name):
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Compares (size, mtime) of every page image each POLL_INTERVAL; works anywhere."""
+
+    method = "polling"
+
+    def __init__(self, root: str, interval: float = POLL_INTERVAL):
+        self.root = root
+        self.interval = interval
+        self.snapshot = self._scan()
+        self.next_scan = time.monotonic() + interval
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        snapshot = {}
+        for path in library_images(self.root):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            snapshot[path] = (st.st_size, st.st_mtime_ns)
+        return snapshot
+
+    def changes(self, timeout: float) -> set[str]:
+        wait = self.next_scan - time.monotonic()
+        if wait > timeout:
+            time.sleep(timeout)
+            return set()
+        if wait > 0:
+            time.sleep(wait)
+        self.next_scan = time.monotonic() + self.interval
+        snapshot = self._scan()
+        changed = {path for path, signature in snapshot.items() if self.snapshot.get(path) != signature}
+        self.snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+
+def make_watcher(root: str, poll: bool = False):
+    """inotify where available, otherwise (or with poll, e.g. on network shares) polling."""
+    if not poll and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError):
+            pass  # no inotify in libc, or out of watches
+    return PollingWatcher(root)
+
+
+# --- Debouncing ---
+def is_complete_image(path: str) -> bool:
+    """Decode the image; a truncated or half-written file raises."""
+    try:
+        with Image.open(path) as img:
+            img.load()
+        return True
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+        return False
+
+
+class Debouncer:
+    """
+    Holds candidate pages until their size and mtime have stayed the same for
+    settle seconds. Captures from ImageCaptureApple.py appear atomically, but
+    files copied in or synced from a phone are written a chunk at a time.
+    """
+
+    def __init__(self, settle: float = SETTLE_SECONDS):
+        self.settle = settle
+        self.pending = {}  # path -> ((size, mtime_ns) last seen, monotonic time it was first seen)
+
+    def add(self, paths, now: float):
+        for path in paths:
+            self.pending.setdefault(path, (None, now))
+
+    def ready(self, now: float) -> tuple[list[str], list[str]]:
+        """Pages that have settled: (complete, unreadable). Both leave the queue."""
+        complete, unreadable = [], []
+        for path, (signature, since) in list(self.pending.items()):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                del self.pending[path]  # deleted or renamed away
+                continue
+            current = (st.st_size, st.st_mtime_ns)
+            if current != signature:
+                self.pending[path] = (current, now)
+                continue
+            if now - since < self.settle:
+                continue
+            del self.pending[path]
+            (complete if is_complete_image(path) else unreadable).append(path)
+        return sorted(complete), sorted(unreadable)
+
+
+# --- Service ---
+def watch_describe(event: dict) -> str | None:
+    kind = event["event"]
+    if kind == "watching":
+        return f"Watching {event['folder']} ({event['method']}, {event['settle']}s settle)"
+    if kind == "pages_ready":
+        return f"{event['book']}: {len(event['pages'])} new or changed page(s)"
+    if kind == "unreadable":
+        return f"{event['book']}: skipped {event['page']}, not a complete image"
+    if kind == "stopped":
+        return f"Stopped after {event['pages']} pages"
+    return describe(event)
+
+
+def process_pages(pipeline, book_name: str, folder: str, skip: set[str], args, emit, stop: threading.Event) -> int:
+    """Run one book, leaving out skip; returns the pages done."""
+    start = time.perf_counter()
+    emit.unresolved_pages = 0
+    emit({"event": "book", "book": book_name, "folder": folder})
+    try:
+        done = run_book(pipeline, book_name, folder, args, emit, stop, skip=skip)
+    except Exception as e:
+        emit({"event": "error", "book": book_name, "message": str(e)})
+        return 0
+    if stop.is_set():
+        emit({"event": "cancelled", "book": book_name})
+        return 0
+    emit({"event": "finished", "book": book_name, "pages": len(done), "unresolved_pages": emit.unresolved_pages,
+          "seconds": round(time.perf_counter() - start, 3)})
+    return len(done)
+
+
+def watch(root: str, args, emit, stop: threading.Event) -> int:
+    """Catch up on pages added while not running, then process pages as they land until stop is set."""
+    pipeline = load_pipeline(args)
+    # Watch before the catch-up pass so nothing written during it is missed
+    watcher = make_watcher(root, args.poll)
+    debouncer = Debouncer(args.settle)
+    emit({"event": "watching", "folder": root, "method": watcher.method, "settle": args.settle})
+    pages = 0
+    try:
+        # Pages touched in the last few seconds may still be being written: debounce those
+        recent = set()
+        for path in library_images(root):
+            try:
+                if time.time() - os.path.getmtime(path) < args.settle:
+                    recent.add(path)
+            except FileNotFoundError:
+                pass
+        debouncer.add(recent, time.monotonic())
+        for book_name, folder in find_books([root]):
+            if stop.is_set():
+                break
+            pages += process_pages(pipeline, book_name, folder, recent, args, emit, stop)
+
+        while not stop.is_set():
+            changed = watcher.changes(CHECK_INTERVAL if debouncer.pending else MAX_WAIT)
+            now = time.monotonic()
+            debouncer.add(changed, now)
+            complete, unreadable = debouncer.ready(now)
+            for path in unreadable:
+                emit({"event": "unreadable", "book": os.path.basename(os.path.dirname(path)),
+                      "page": os.path.basename(path)})
+
+            by_folder = {}
+            for path in complete:
+                by_folder.setdefault(os.path.dirname(path), set()).add(path)
+            for folder, ready in by_folder.items():
+                if stop.is_set():
+                    break
+                book_name = os.path.basename(folder)
+                emit({"event": "pages_ready", "book": book_name, "pages": sorted(os.path.basename(p) for p in ready)})
+                # Only the settled pages: others in the folder may still be half written
+                try:
+                    skip = {os.path.join(folder, f) for f in list_page_images(folder)} - ready
+                except FileNotFoundError:
+                    continue
+                pages += process_pages(pipeline, book_name, folder, skip, args, emit, stop)
+    finally:
+        watcher.close()
+    emit({"event": "stopped", "pages": pages})
+    return 0
+
+
+# --- Command line ---
+# Usage: python Watch_service.py [LIBRARY] [--settle S] [--poll] [--format pdf|csv|jsonl|anki|none]
+#                                [--offline] [--json]
+# LIBRARY is the folder holding the book folders (default: book/). Runs until
+# Ctrl-C or SIGTERM; a page being processed then is picked up on the next start.
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Watch the book folders and process new or changed pages as they are captured.")
+    parser.add_argument("root", nargs="?", default=BOOKS_DIR, help="library folder holding the book folders")
+    parser.add_argument("--settle", type=float, default=SETTLE_SECONDS,
+                        help="seconds a page must stay unchanged before it is processed")
+    parser.add_argument("--poll", action="store_true", help="scan the folders instead of using inotify")
+    add_pipeline_options(parser)
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    root = os.path.abspath(args.root)
+    if not os.path.isdir(root):
+        print(f"No such folder: {root}", file=sys.stderr)
+        sys.exit(EXIT_USAGE)
+    emit = Progress(json_lines=args.json, describe=watch_describe)
+
+    stop = threading.Event()
+
+    def request_stop(signum, frame):
+        stop.set()
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+    sys.exit(watch(root, args, emit, stop))
@@ -0,0 +1,314 @@
+import os
+import sys
+import time
+import uuid
+import queue
+import secrets
+import socket
+import threading
+import subprocess
+from multiprocessing.connection import AuthenticationError, Client, Listener
+from Export_module import DEFAULT_FORMAT
+
+# --- Setup ---
+# A long-lived local process that keeps spaCy, the frequency indexes, the
+# DanNet index and the translation caches warm. GUIs and scripts talk to it
+# over an authenticated localhost connection instead of loading them again.
+WORDS_DIR = os.path.join(os.getcwd(), "word")
+WORKER_HOST = "127.0.0.1"
+WORKER_PORT = int(os.environ.get("BOOK2WORDS_WORKER_PORT", 47653))
+WORKER_KEY_PATH = os.path.join(WORDS_DIR, "worker.key")
+WORKER_LOG_PATH = os.path.join(WORDS_DIR, "worker.log")
+
+# Exit after this long without any client activity (seconds)
+IDLE_TIMEOUT = 30 * 60
+# How long to wait for a freshly spawned worker to load its models
+START_TIMEOUT = 60
+
+TERMINAL_EVENTS = ("finished", "cancelled", "error")
+
+
+# --- Server ---
+class WorkerServer:
+    def __init__(self, idle_timeout: float = IDLE_TIMEOUT):
+        import BookPipeline_module as pipeline  # the heavy part, loaded once
+        from DanishDictionary_module import cache, translate_danish_words
+
+        self.pipeline = pipeline
+        self.translate_danish_words = translate_danish_words
+        self.cache = cache
+        pipeline.warm_up()
+
+        self.idle_timeout = idle_timeout
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.active = 0
+        self.last_active = time.monotonic()
+        self.listener = None
+        self.stopping = threading.Event()
+
+    def serve(self):
+        key = secrets.token_bytes(32)
+        self.listener = Listener((WORKER_HOST, WORKER_PORT), authkey=key)
+
+        # Only processes that can read the key file (this user) may connect
+        os.makedirs(WORDS_DIR, exist_ok=True)
+        fd = os.open(WORKER_KEY_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(key)
+
+        threading.Thread(target=self._idle_watchdog, daemon=True).start()
+        print(f"Worker {os.getpid()} listening on {WORKER_HOST}:{WORKER_PORT}", flush=True)
+        while not self.stopping.is_set():
+            try:
+                conn = self.listener.accept()
+            except (AuthenticationError, EOFError, ConnectionError):
+                continue  # includes stop()'s wake-up connection
+            except OSError:
+                break
+            if self.stopping.is_set():
+                conn.close()
+                break
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+        self.listener.close()
+        print(f"Worker {os.getpid()} stopped", flush=True)
+
+    def stop(self):
+        """
+        Make serve() return. Closing the listener from another thread doesn't
+        interrupt a blocked accept() on Linux, so wake it with a throwaway
+        connection instead.
+        """
+        self.stopping.set()
+        if self.listener is not None:
+            try:
+                socket.create_connection(self.listener.address, timeout=1).close()
+            except OSError:
+                pass
+
+    def _idle_watchdog(self):
+        while True:
+            time.sleep(min(60, self.idle_timeout))
+            with self.lock:
+                idle = self.active == 0 and time.monotonic() - self.last_active > self.idle_timeout
+            if idle:
+                self.stop()
+                return
+
+    def _handle(self, conn):
+        with self.lock:
+            self.active += 1
+        try:
+            request = conn.recv()
+            cmd = request.get("cmd")
+            if cmd == "ping":
+                conn.send({"ok": True, "pid": os.getpid()})
+            elif cmd == "process_book":
+                self._run_book(conn, request)
+            elif cmd == "cancel":
+                job = self.jobs.get(request.get("job_id"))
+                if job is not None:
+                    job.cancel()
+                conn.send({"ok": job is not None})
+            elif cmd == "translate":
+                result = self.translate_danish_words(request["words"], speedy=request.get("speedy", True))
+                conn.send({"ok": True, "result": result})
+            elif cmd == "stats":
+                conn.send({"ok": True, "cache": self.cache.stats(), "jobs": len(self.jobs)})
+            elif cmd == "shutdown":
+                conn.send({"ok": True})
+                self.stop()
+            else:
+                conn.send({"ok": False, "error": f"Unknown command: {cmd}"})
+        except (EOFError, OSError):
+            pass
+        except Exception as e:
+            try:
+                conn.send({"ok": False, "error": str(e)})
+            except OSError:
+                pass
+        finally:
+            conn.close()
+            with self.lock:
+                self.active -= 1
+                self.last_active = time.monotonic()
+
+    def _run_book(self, conn, request):
+        """Start a book job and stream its events back until it ends."""
+        job = self.pipeline.start_book_job(request["book"], request["folder"], request["db"],
+                                           export_path=request.get("export"),
+                                           export_format=request.get("format", DEFAULT_FORMAT),
+                                           **request.get("options", {}))
+        job_id = uuid.uuid4().hex
+        self.jobs[job_id] = job
+        try:
+            conn.send({"event": "accepted", "job_id": job_id})
+            while True:
+                try:
+                    event = job.events.get(timeout=0.5)
+                except queue.Empty:
+                    if not job.is_running() and job.events.empty():
+                        break
+                    continue
+                conn.send(event)
+                if event["event"] in TERMINAL_EVENTS:
+                    break
+        except (EOFError, OSError):
+            job.cancel()  # the client went away
+        finally:
+            self.jobs.pop(job_id, None)
+
+
+# --- Client ---
+def _connect():
+    """Open an authenticated connection to the worker, or None if it isn't running."""
+    try:
+        with open(WORKER_KEY_PATH, "rb") as f:
+            key = f.read()
+        return Client((WORKER_HOST, WORKER_PORT), authkey=key)
+    except (OSError, EOFError, AuthenticationError):
+        return None
+
+
+class WorkerClient:
+    """Thin client for the worker service; each request uses its own connection."""
+
+    def request(self, payload: dict) -> dict:
+        conn = _connect()
+        if conn is None:
+            raise ConnectionError("Worker service is not running")
+        try:
+            conn.send(payload)
+            return conn.recv()
+        finally:
+            conn.close()
+
+    def ping(self) -> bool:
+        try:
+            return self.request({"cmd": "ping"}).get("ok", False)
+        except (ConnectionError, EOFError, OSError):
+            return False
+
+    def translate_words(self, words, speedy: bool = True) -> dict:
+        response = self.request({"cmd": "translate", "words": list(words), "speedy": speedy})
+        if not response.get("ok"):
+            raise RuntimeError(response.get("error"))
+        return response["result"]
+
+    def stats(self) -> dict:
+        return self.request({"cmd": "stats"})
+
+    def shutdown(self):
+        self.request({"cmd": "shutdown"})
+
+    def start_book_job(self, book_name: str, folder_path: str, db_path: str, export_path: str | None = None,
+                       export_format: str = DEFAULT_FORMAT, **options) -> "RemoteBookJob":
+        """Same call as BookPipeline_module.start_book_job, run inside the worker."""
+        return RemoteBookJob(book_name, folder_path, db_path, export_path, export_format, options).start()
+
+
+class RemoteBookJob:
+    """Mirrors BookJob (events queue, cancel, resume, done) for a job running in the worker."""
+
+    def __init__(self, book_name: str, folder_path: str, db_path: str, export_path: str | None,
+                 export_format: str, options: dict, skip: set[str] | None = None):
+        self.book_name = book_name
+        self.folder_path = folder_path
+        self.db_path = db_path
+        self.export_path = export_path
+        self.export_format = export_format
+        self.options = options
+        self.done = set(skip or ())
+        self.job_id = None
+        self.events = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> "RemoteBookJob":
+        self.thread.start()
+        return self
+
+    def is_running(self) -> bool:
+        return self.thread.is_alive()
+
+    def cancel(self):
+        if self.job_id is not None:
+            try:
+                WorkerClient().request({"cmd": "cancel", "job_id": self.job_id})
+            except (ConnectionError, EOFError, OSError):
+                pass
+
+    def resume(self) -> "RemoteBookJob":
+        options = dict(self.options, skip=self.done)
+        return RemoteBookJob(self.book_name, self.folder_path, self.db_path, self.export_path, self.export_format,
+                             options, skip=self.done).start()
+
+    def _run(self):
+        conn = _connect()
+        if conn is None:
+            self.events.put({"event": "error", "book": self.book_name, "message": "Worker service is not running"})
+            return
+        try:
+            conn.send({"cmd": "process_book", "book": self.book_name, "folder": self.folder_path,
+                       "db": self.db_path, "export": self.export_path, "format": self.export_format,
+                       "options": self.options})
+            while True:
+                event = conn.recv()
+                if "ok" in event:
+                    # The worker rejected the request before starting a job
+                    self.events.put({"event": "error", "book": self.book_name, "message": event.get("error")})
+                    break
+                if event.get("event") == "accepted":
+                    self.job_id = event["job_id"]
+                    continue
+                if event.get("event") == "page_done":
+                    self.done.add(event["path"])
+                self.events.put(event)
+                if event.get("event") in TERMINAL_EVENTS:
+                    break
+        except (EOFError, OSError) as e:
+            self.events.put({"event": "error", "book": self.book_name, "message": f"Lost worker connection: {e}"})
+        finally:
+            conn.close()
+
+
+def connect_worker() -> WorkerClient | None:
+    """Return a client if a worker is already running."""
+    client = WorkerClient()
+    return client if client.ping() else None
+
+
+def ensure_worker(timeout: float = START_TIMEOUT) -> WorkerClient | None:
+    """Connect to the worker, spawning it in the background first if needed."""
+    client = connect_worker()
+    if client is not None:
+        return client
+
+    os.makedirs(WORDS_DIR, exist_ok=True)
+    with open(WORKER_LOG_PATH, "ab") as log:
+        subprocess.Popen([sys.executable, os.path.abspath(__file__)], cwd=os.getcwd(),
+                         stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+
+    client = WorkerClient()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        time.sleep(0.5)
+        if client.ping():
+            return client
+    return None
+
+
+# --- Run Service ---
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "serve"
+    if command == "serve":
+        WorkerServer().serve()
+    elif command == "status":
+        client = connect_worker()
+        print(client.stats() if client else "Worker service is not running")
+    elif command == "stop":
+        client = connect_worker()
+        if client:
+            client.shutdown()
+        print("Stopped" if client else "Worker service is not running")
+    else:
+        print("Usage: python Worker_service.py [serve|status|stop]")
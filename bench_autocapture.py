@@ -0,0 +1,130 @@
+import os
+import random
+import sys
+import tempfile
+import time
+import cv2
+import numpy as np
+from wordfreq import top_n_list
+from AutoCapture_module import ANALYSIS_SIZE, PageTurnDetector, detect_pages, sharpness
+from CameraPreview_module import PREVIEW_SIZE, VideoFileSource
+
+# --- Benchmark: hands-free page capture on a recorded video ---
+# Renders a synthetic page-turning session (text pages, sliding turns with
+# motion blur, focus hunting after each turn, sensor noise, one turn back to
+# the same page), replays it headlessly through the frame-source interface
+# and checks every capture against the ground truth.
+# Usage: python bench_autocapture.py [pages]
+PAGES = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+VIDEO_FPS = 30
+VIDEO_SIZE = (1280, 720)
+HOLD_FRAMES = 45  # 1.5 s on each page
+TURN_FRAMES = 12
+FOCUS_FRAMES = 8  # blurry frames while the camera refocuses after a turn
+REPEAT_AT = 5  # this page is "turned" back to itself: a duplicate
+
+
+def render_page(rng: random.Random, words: list[str]) -> np.ndarray:
+    page = np.full((VIDEO_SIZE[1], VIDEO_SIZE[0], 3), 232, np.uint8)
+    y = 50
+    while y < VIDEO_SIZE[1] - 40:
+        if rng.random() < 0.15:
+            y += 30  # paragraph break
+            continue
+        line = " ".join(rng.choices(words, k=rng.randint(4, 11)))
+        cv2.putText(page, line, (70, y), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (35, 35, 35), 2, cv2.LINE_AA)
+        y += 32
+    return page
+
+
+def make_session(path: str, pages: int) -> tuple[list[np.ndarray], list[int]]:
+    """Write the video; returns each hold's clean image and page number (the expected captures)."""
+    rng = random.Random(0)
+    np_rng = np.random.default_rng(0)
+    words = top_n_list("da", 3000)
+    images = [render_page(rng, words) for _ in range(pages)]
+    repeat = min(REPEAT_AT, pages - 1)
+    order = list(range(pages))
+    order.insert(repeat + 1, repeat)
+
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), VIDEO_FPS, VIDEO_SIZE)
+    noise = np_rng.normal(0, 3, (8, VIDEO_SIZE[1], VIDEO_SIZE[0], 3)).astype(np.int16)
+    for hold, page in enumerate(order):
+        image = images[page]
+        if hold:
+            previous = images[order[hold - 1]]
+            for t in range(1, TURN_FRAMES + 1):
+                x = VIDEO_SIZE[0] - VIDEO_SIZE[0] * t // TURN_FRAMES
+                frame = previous.copy()
+                frame[:, x:] = image[:, :VIDEO_SIZE[0] - x]
+                writer.write(cv2.blur(frame, (25, 1)))
+        for t in range(HOLD_FRAMES):
+            frame = image
+            if t < FOCUS_FRAMES:
+                radius = 2 * (FOCUS_FRAMES - t) + 1
+                frame = cv2.GaussianBlur(image, (radius, radius), 0)
+            frame = np.clip(frame.astype(np.int16) + noise[t % len(noise)], 0, 255).astype(np.uint8)
+            writer.write(frame)
+    writer.release()
+    return [images[page] for page in order], order
+
+
+class TimedDetector(PageTurnDetector):
+    """Counts the time spent in feed()."""
+
+    def __init__(self):
+        super().__init__()
+        self.elapsed = 0.0
+        self.frames = 0
+
+    def feed(self, frame, small, captured_at=0.0):
+        start = time.perf_counter()
+        capture = super().feed(frame, small, captured_at)
+        self.elapsed += time.perf_counter() - start
+        self.frames += 1
+        return capture
+
+
+def in_focus_sharpness(image: np.ndarray) -> float:
+    """The clean page's sharpness, measured the way the detector sees frames."""
+    small = cv2.resize(image, PREVIEW_SIZE, interpolation=cv2.INTER_LINEAR)
+    gray = cv2.resize(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY), ANALYSIS_SIZE, interpolation=cv2.INTER_AREA)
+    return sharpness(gray)
+
+
+def closest_page(frame: np.ndarray, images: list[np.ndarray]) -> int:
+    small = cv2.resize(frame, (160, 90), interpolation=cv2.INTER_AREA).astype(np.int16)
+    diffs = [np.abs(cv2.resize(image, (160, 90), interpolation=cv2.INTER_AREA).astype(np.int16) - small).mean()
+             for image in images]
+    return int(np.argmin(diffs))
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        video = os.path.join(tmp, "session.avi")
+        images, order = make_session(video, PAGES)
+        repeated = [hold for hold in range(1, len(order)) if order[hold] in order[:hold]]
+        print(f"{len(order)} holds ({PAGES} pages, page {order[repeated[0]] + 1} shown twice), "
+              f"{len(order) * (HOLD_FRAMES + TURN_FRAMES) / VIDEO_FPS:.0f}s of video\n")
+
+        detector = TimedDetector()
+        start = time.perf_counter()
+        captures = list(detect_pages(VideoFileSource(video, realtime=False), detector=detector))
+        elapsed = time.perf_counter() - start
+
+        crisp = [in_focus_sharpness(image) for image in images]
+        right_page = 0
+        sharp_picks = 0
+        for capture in captures:
+            hold = capture["index"]
+            page = closest_page(capture["frame"], images)
+            right_page += hold < len(order) and order[page] == order[hold]
+            sharp_picks += hold < len(order) and capture["sharpness"] >= 0.8 * crisp[hold]
+        flagged = [c["index"] for c in captures if c["duplicate_of"] is not None]
+
+        print(f"captures         {len(captures)} / {len(order)} expected")
+        print(f"right page       {right_page} / {len(order)}")
+        print(f"sharp pick       {sharp_picks} / {len(captures)} (within 80% of the in-focus page)")
+        print(f"flagged as dups  {[i + 1 for i in flagged]} (expected {[hold + 1 for hold in repeated]})")
+        print(f"analysis         {1000 * detector.elapsed / detector.frames:.2f} ms/frame over {detector.frames} frames")
+        print(f"replay           {elapsed:.1f}s total")
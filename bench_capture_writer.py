@@ -0,0 +1,83 @@
+import os
+import random
+import sys
+import tempfile
+import time
+import cv2
+import numpy as np
+from wordfreq import top_n_list
+from CaptureWriter_module import CaptureWriter, capture_settings, write_capture
+
+# --- Benchmark: what a capture costs the UI thread, and each format's cost ---
+# Old: cv2.imwrite of the full frame on the Tk thread for every capture.
+# New: CaptureWriter.submit() queues it; encoding, fsync and rename happen
+#      on the writer thread.
+# Then encode + durable write time and file size for each capture setting.
+# Usage: python bench_capture_writer.py [captures]
+CAPTURES = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+FRAME_SIZE = (1920, 1080)
+SETTINGS = {
+    "jpeg q92": capture_settings("jpeg"),
+    "jpeg q80": capture_settings("jpeg", quality=80),
+    "jpeg q92 grayscale": capture_settings("jpeg", grayscale=True),
+    "jpeg q92 max 1600": capture_settings("jpeg", max_side=1600),
+    "jpeg q92 max 960": capture_settings("jpeg", max_side=960),
+    "png": capture_settings("png"),
+    "png grayscale": capture_settings("png", grayscale=True),
+    "webp q90": capture_settings("webp"),
+}
+
+
+def page_frame() -> np.ndarray:
+    """A camera-like page: text on slightly uneven paper with sensor noise."""
+    rng = random.Random(0)
+    words = top_n_list("da", 3000)
+    frame = np.full((FRAME_SIZE[1], FRAME_SIZE[0], 3), 225, np.uint8)
+    for y in range(70, FRAME_SIZE[1] - 50, 42):
+        line = " ".join(rng.choices(words, k=rng.randint(6, 14)))
+        cv2.putText(frame, line, (90, y), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (40, 40, 40), 2, cv2.LINE_AA)
+    noise = np.random.default_rng(0).normal(0, 4, frame.shape)
+    return np.clip(frame + noise, 0, 255).astype(np.uint8)
+
+
+def ui_stall_old(frame: np.ndarray, folder: str) -> tuple[float, float]:
+    stalls = []
+    start = time.perf_counter()
+    for i in range(CAPTURES):
+        t = time.perf_counter()
+        cv2.imwrite(os.path.join(folder, f"old_{i}.jpg"), frame)
+        stalls.append(time.perf_counter() - t)
+    return max(stalls), time.perf_counter() - start
+
+
+def ui_stall_new(frame: np.ndarray, folder: str) -> tuple[float, float, float]:
+    writer = CaptureWriter()
+    settings = capture_settings("jpeg")
+    stalls = []
+    start = time.perf_counter()
+    for i in range(CAPTURES):
+        copy = frame.copy()  # the app hands over PreviewPipeline.latest_frame()'s copy
+        t = time.perf_counter()
+        writer.submit(copy, folder, f"new_{i}", settings)
+        stalls.append(time.perf_counter() - t)
+    queued = sum(stalls)
+    writer.close()
+    return max(stalls), queued, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    frame = page_frame()
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{CAPTURES} captures of {FRAME_SIZE[0]}x{FRAME_SIZE[1]} in a burst\n")
+        worst, total = ui_stall_old(frame, tmp)
+        print(f"old: imwrite on UI thread   worst stall {1000 * worst:6.1f} ms   UI blocked {1000 * total:7.1f} ms")
+        worst, queued, drained = ui_stall_new(frame, tmp)
+        print(f"new: CaptureWriter.submit   worst stall {1000 * worst:6.1f} ms   UI blocked {1000 * queued:7.1f} ms"
+              f"   (all on disk after {1000 * drained:.0f} ms)")
+
+        print(f"\n{'setting':20s} {'write ms':>9s} {'size KB':>8s}")
+        for name, settings in SETTINGS.items():
+            start = time.perf_counter()
+            paths = [write_capture(frame, tmp, "fmt", settings) for _ in range(5)]
+            elapsed = (time.perf_counter() - start) / len(paths)
+            print(f"{name:20s} {1000 * elapsed:9.1f} {os.path.getsize(paths[0]) / 1e3:8.0f}")
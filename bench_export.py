@@ -0,0 +1,100 @@
+import os
+import random
+import sys
+import tempfile
+import time
+import resource
+from concurrent.futures import ProcessPoolExecutor
+from wordfreq import top_n_list
+from functools import partial
+from Export_module import TEXT_EXPORTERS, export_book, export_word_definitions_to_pdf
+from VocabStore_module import VocabStore
+
+# --- Benchmark: PDF export of a large vocabulary list ---
+# Old: fetchall, dedup in Python, one reportlab Table with plain-string cells.
+# New: SQL dedup streamed into LongTable chunks of wrapped Paragraphs.
+# Then the streaming text formats (CSV, JSONL, Anki TSV) on the same rows.
+# Usage: python bench_export.py [rows] [--skip-old]
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 10000
+SKIP_OLD = "--skip-old" in sys.argv
+OCCURRENCES_PER_WORD = 3
+
+
+def build_library(db_path: str, n: int) -> str:
+    """A book with n unique words, each on a few pages, with sentence-length definitions."""
+    rng = random.Random(0)
+    vocab = top_n_list("da", n)
+    filler = top_n_list("en", 2000)
+    store = VocabStore(db_path)
+    book_id = store.book_id("bench")
+    pages = {}
+    for word in vocab:
+        definition = " ".join(rng.choices(filler, k=rng.randint(4, 40)))
+        store.add_entries({word: definition})
+        for page_number in rng.sample(range(1, 400), OCCURRENCES_PER_WORD):
+            pages.setdefault(page_number, {})[word] = word
+    for page_number, words in pages.items():
+        store.add_occurrences(store.page_id(book_id, page_number), words)
+    store.commit()
+    store.close()
+    return db_path
+
+
+def old_export(db_path: str, output_pdf: str) -> int:
+    """The export before streaming, kept here for comparison."""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
+
+    store = VocabStore(db_path)
+    rows = list(store.book_rows("bench"))
+    store.close()
+    seen, unique_rows = set(), []
+    for word, definition, page_number, book_name in rows:
+        if word not in seen:
+            unique_rows.append((word, definition, page_number, book_name))
+            seen.add(word)
+    table = Table([["Word", "Definition", "Page Number", "Book Name"]] + unique_rows,
+                  colWidths=[100, 200, 80, 150])
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ]))
+    SimpleDocTemplate(output_pdf, pagesize=letter).build([table])
+    return len(unique_rows)
+
+
+def new_export(db_path: str, output_pdf: str) -> int:
+    return export_word_definitions_to_pdf(db_path, output_pdf, "bench")
+
+
+def text_export(fmt: str, db_path: str, output_path: str) -> int:
+    return export_book(db_path, output_path, "bench", fmt)
+
+
+def timed(export, db_path: str, output_pdf: str) -> tuple[int, float, int]:
+    """Run in a fresh process so its peak RSS growth belongs to this export alone."""
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    rows = export(db_path, output_pdf)
+    elapsed = time.perf_counter() - start
+    return rows, elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before
+
+
+def measure(name: str, export, db_path: str, output_pdf: str):
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        rows, elapsed, max_rss = pool.submit(timed, export, db_path, output_pdf).result()
+    print(f"{name:26s} {rows:6d} rows  {elapsed:7.2f}s  {rows / elapsed:7.0f} rows/s  "
+          f"peak RSS +{max_rss / 1e3:5.1f} MB  {os.path.getsize(output_pdf) / 1e6:5.1f} MB out")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = build_library(os.path.join(tmp, "bench.db"), ROWS)
+        print(f"{ROWS} unique words, {ROWS * OCCURRENCES_PER_WORD} occurrences\n")
+        if not SKIP_OLD:
+            measure("old: one Table", old_export, db_path, os.path.join(tmp, "old.pdf"))
+        measure("new: streamed LongTables", new_export, db_path, os.path.join(tmp, "new.pdf"))
+        for fmt in TEXT_EXPORTERS:
+            measure(fmt, partial(text_export, fmt), db_path, os.path.join(tmp, f"bench.{fmt}"))
@@ -0,0 +1,106 @@
+import random
+import re
+import sys
+import time
+from wordfreq import top_n_list
+from FreqIndex_module import get_freq_index
+from LanguageDetect_module import detect_segments
+from Lemmatizer_module import MODEL_NAME
+
+# --- Benchmark: whole-page majority vote vs per-line detection ---
+# Synthetic OCR pages: mostly Danish lines with English quotations mixed in.
+# Usage: python bench_language.py [pages]
+PAGES = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+LINES_PER_PAGE = 30
+WORDS_PER_LINE = 9
+ENGLISH_LINE_SHARE = 0.2
+
+english_words = get_freq_index("en").top(30000)
+danish_words = get_freq_index("da").top(30000)
+
+
+def synthetic_pages(n: int) -> list[tuple[dict, list[str]]]:
+    """(ocr_data, true language per word) for n pages, quotes in their own block."""
+    rng = random.Random(0)
+    vocab = {lang: top_n_list(lang, 20000) for lang in ("en", "da")}
+    weights = [1 / (rank + 1) for rank in range(20000)]
+    pages = []
+    for _ in range(n):
+        ocr_data = {"text": [], "block_num": [], "par_num": [], "line_num": []}
+        truth = []
+        block = 1
+        for line_num in range(1, LINES_PER_PAGE + 1):
+            lang = "en" if rng.random() < ENGLISH_LINE_SHARE else "da"
+            block += 1 if lang == "en" or rng.random() < 0.2 else 0
+            for word in rng.choices(vocab[lang], weights=weights, k=WORDS_PER_LINE):
+                ocr_data["text"].append(word)
+                ocr_data["block_num"].append(block)
+                ocr_data["par_num"].append(1)
+                ocr_data["line_num"].append(line_num)
+                truth.append(lang)
+        pages.append((ocr_data, truth))
+    return pages
+
+
+def majority_vote(ocr_data: dict, nlp) -> list[str | None]:
+    """The old path, as it was: run spaCy over the whole page, then one language for every word."""
+    all_words = []
+    for w in ocr_data["text"]:
+        w = re.sub(r"[^\w\u4e00-\u9fff]", "", w)
+        if w.strip() != "":
+            all_words.append(w)
+
+    filtered_words = [w for w in all_words if len(w) > 2]
+    doc = nlp(" ".join(filtered_words))
+    lemmas_set = set([token.lemma_ for token in doc])
+
+    lang_votes = {"en": 0, "da": 0, "zh": 0}
+    for w in lemmas_set:
+        lw = w.lower()
+        if lw in english_words:
+            lang_votes["en"] += 1
+        elif lw in danish_words:
+            lang_votes["da"] += 1
+        elif re.search(r"[\u4e00-\u9fff]", w):
+            lang_votes["zh"] += 1
+    majority_lang = max(lang_votes, key=lang_votes.get)
+    # Every word on the page gets the page's language
+    return [majority_lang] * len(ocr_data["text"])
+
+
+def load_old_model():
+    """The full spaCy pipeline the old path loaded, or None if it isn't installed."""
+    try:
+        import spacy
+        return spacy.load(MODEL_NAME)
+    except (ImportError, OSError):
+        return None
+
+
+def per_line(ocr_data: dict) -> list[str | None]:
+    return [lang for _, lang, words in detect_segments(ocr_data) for _ in words]
+
+
+def report(name: str, pages, detect):
+    start = time.perf_counter()
+    routed = [detect(ocr_data) for ocr_data, _ in pages]
+    elapsed = time.perf_counter() - start
+    words = sum(len(truth) for _, truth in pages)
+    correct = sum(a == b for r, (_, truth) in zip(routed, pages) for a, b in zip(r, truth))
+    english = [(a, b) for r, (_, truth) in zip(routed, pages) for a, b in zip(r, truth) if b == "en"]
+    print(f"{name:22s} {elapsed / len(pages) * 1e3:7.2f} ms/page  "
+          f"{100 * correct / words:5.1f}% words routed correctly  "
+          f"{100 * sum(a == b for a, b in english) / len(english):5.1f}% of English lines")
+
+
+if __name__ == "__main__":
+    pages = synthetic_pages(PAGES)
+    print(f"{PAGES} pages x {LINES_PER_PAGE} lines, {100 * ENGLISH_LINE_SHARE:.0f}% English lines\n")
+
+    nlp = load_old_model()  # outside the timing
+    if nlp is None:
+        print(f"old: majority vote      skipped, needs spaCy and {MODEL_NAME} "
+              f"(python -m spacy download {MODEL_NAME})")
+    else:
+        report("old: majority vote", pages, lambda ocr_data: majority_vote(ocr_data, nlp))
+    report("new: per-line", pages, per_line)
@@ -0,0 +1,61 @@
+import os
+import random
+import sys
+import time
+import spacy
+from wordfreq import top_n_list
+from Lemmatizer_module import MODEL_NAME, Lemmatizer
+
+# --- Benchmark: per-token nlp() calls vs batched, cached lemmatisation ---
+# Usage: python bench_lemmatize.py [tokens]
+TOKENS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+
+def book_like_tokens(n: int) -> list[str]:
+    """Zipf-ish token stream drawn from the 20k most frequent Danish words."""
+    vocab = top_n_list("da", 20000)
+    weights = [1 / (rank + 1) for rank in range(len(vocab))]
+    return random.Random(0).choices(vocab, weights=weights, k=n)
+
+
+def report(name: str, elapsed: float, n: int):
+    print(f"{name:28s} {elapsed:7.2f}s  {n / elapsed:9.0f} tokens/s")
+
+
+if __name__ == "__main__":
+    tokens = book_like_tokens(TOKENS)
+    print(f"{len(tokens)} tokens, {len(set(tokens))} unique\n")
+
+    # Old path: full pipeline, one call per token
+    nlp_full = spacy.load(MODEL_NAME)
+    start = time.perf_counter()
+    old = {w: (doc[0].lemma_ if doc else w.lower()) for w in tokens for doc in [nlp_full(w)]}
+    report("old: nlp(word) per token", time.perf_counter() - start, len(tokens))
+
+    cache_path = os.path.join(os.getcwd(), "bench_lemma_cache.db")
+    if os.path.exists(cache_path):
+        os.remove(cache_path)
+    lemmatizer = Lemmatizer(cache_path=cache_path)
+    start = time.perf_counter()
+    lemmatizer.nlp  # load the model outside the other timings
+    print(f"{'model load (no parser/ner)':28s} {time.perf_counter() - start:7.2f}s")
+
+    start = time.perf_counter()
+    new = lemmatizer.lemmatize_words(tokens)
+    report("new: nlp.pipe, cold cache", time.perf_counter() - start, len(tokens))
+
+    start = time.perf_counter()
+    lemmatizer.lemmatize_words(tokens)
+    report("new: in-process memo", time.perf_counter() - start, len(tokens))
+
+    # A fresh process starts with only the on-disk cache; when every word is
+    # a hit it should not load the model at all
+    start = time.perf_counter()
+    fresh = Lemmatizer(cache_path=cache_path)
+    fresh.lemmatize_words(tokens)
+    report("new: on-disk cache, fresh", time.perf_counter() - start, len(tokens))
+    print(f"{'':28s} model loaded: {'yes' if fresh._nlp is not None else 'no'}")
+
+    same = sum(old[w] == new[w] for w in set(tokens))
+    print(f"\nlemma agreement with old path: {same}/{len(set(tokens))}")
+    os.remove(cache_path)
@@ -0,0 +1,37 @@
+import os
+import sys
+import time
+from PageOCR_module import list_page_images, ocr_pages
+
+# --- Benchmark: page OCR scaling with worker count ---
+# Tesseract runs every time: with the OCR cache the first worker count would
+# fill it and the rest (and the REPEATed pages) would only time cache hits.
+# Usage: python bench_ocr.py [library_dir] [repeat]
+LIBRARY_DIR = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.getcwd(), "Book")
+REPEAT = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+
+
+def collect_pages(library_dir: str) -> list[str]:
+    pages = []
+    for book in sorted(os.listdir(library_dir)):
+        folder = os.path.join(library_dir, book)
+        if os.path.isdir(folder):
+            pages += [os.path.join(folder, f) for f in list_page_images(folder)]
+    return pages
+
+
+if __name__ == "__main__":
+    # Repeat the sample pages so there is enough work to spread out
+    pages = collect_pages(LIBRARY_DIR) * REPEAT
+    cores = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, cores})
+
+    print(f"{len(pages)} pages, {cores} cores")
+    baseline = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        words = sum(len(ocr_data["text"]) for _, ocr_data in ocr_pages(pages, workers=workers, use_cache=False))
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"workers={workers:2d}  {elapsed:6.2f}s  {len(pages) / elapsed:5.2f} pages/s  "
+              f"speedup x{baseline / elapsed:.2f}  ({words} boxes)")
@@ -0,0 +1,42 @@
+import os
+import re
+import sys
+import time
+from ImagePreprocess_module import PREPROCESS_PRESETS, open_for_preset
+from PageOCR_module import ocr_image
+from bench_ocr import collect_pages
+
+# --- Benchmark: OCR wall time and word recall per preprocessing preset ---
+# Recall is measured against the words the unprocessed ("none") path finds.
+# Usage: python bench_preprocess.py [library_dir] [rotation]
+LIBRARY_DIR = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.getcwd(), "Book")
+ROTATION = sys.argv[2] if len(sys.argv) > 2 else "osd"
+
+
+def page_words(ocr_data: dict) -> set[str]:
+    words = (re.sub(r"[^\w\u4e00-\u9fff]", "", w).lower() for w in ocr_data["text"])
+    return {w for w in words if len(w) > 2}
+
+
+if __name__ == "__main__":
+    pages = collect_pages(LIBRARY_DIR)
+    print(f"{len(pages)} pages from {LIBRARY_DIR}, rotation={ROTATION}\n")
+
+    reference = {}
+    baseline = None
+    for preset in PREPROCESS_PRESETS:
+        elapsed, found, matched = 0.0, 0, 0
+        for img_path in pages:
+            start = time.perf_counter()
+            words = page_words(ocr_image(open_for_preset(img_path, preset), ROTATION, preset))
+            elapsed += time.perf_counter() - start
+            if preset == "none":
+                reference[img_path] = words
+            found += len(words)
+            matched += len(words & reference[img_path])
+
+        total_reference = sum(len(w) for w in reference.values()) or 1
+        per_page = elapsed / len(pages)
+        baseline = baseline or per_page
+        print(f"{preset:9s} {per_page:6.2f}s/page  x{baseline / per_page:4.2f}  "
+              f"{found:5d} words  recall {100 * matched / total_reference:5.1f}%")
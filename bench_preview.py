@@ -0,0 +1,107 @@
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+import cv2
+import numpy as np
+from PIL import Image
+from CameraPreview_module import PREVIEW_FPS, PREVIEW_SIZE, PreviewPipeline, VideoFileSource
+
+# --- Benchmark: camera preview CPU and latency ---
+# A recorded 720p "camera" plays back in real time (30 fps) on a background
+# thread, while a consumer thread stands in for Tk's event loop.
+# Old: every frame decoded, scaled and converted to a fresh PIL image, each
+#      queued to the UI (after(0) per frame).
+# New: PreviewPipeline capped at PREVIEW_FPS, drop-oldest slot, reused buffers,
+#      the UI woken only when a frame lands in the empty slot.
+# Painting is stood in for by copying the image, the same cost either way.
+# Usage: python bench_preview.py [seconds]
+SECONDS = float(sys.argv[1]) if len(sys.argv) > 1 else 8
+VIDEO_FPS = 30
+VIDEO_SIZE = (1280, 720)
+
+
+def make_video(path: str, seconds: float) -> str:
+    """Page-like frames: dark "text lines" on paper, shifting a little every frame."""
+    rng = np.random.default_rng(0)
+    page = np.full((VIDEO_SIZE[1], VIDEO_SIZE[0], 3), 235, np.uint8)
+    for y in range(40, VIDEO_SIZE[1] - 40, 22):
+        for x in range(60, VIDEO_SIZE[0] - 60, int(rng.integers(30, 90))):
+            page[y:y + 12, x:x + int(rng.integers(15, 60))] = 30
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), VIDEO_FPS, VIDEO_SIZE)
+    for i in range(int(seconds * VIDEO_FPS)):
+        writer.write(np.roll(page, i % 20, axis=1))
+    writer.release()
+    return path
+
+
+def paint(img: Image.Image):
+    img.copy()
+
+
+def old_preview(video: str) -> dict:
+    """The capture loop before the preview pipeline, kept here for comparison."""
+    source = VideoFileSource(video)
+    ui = queue.Queue()
+    latencies = []
+
+    def camera_loop():
+        while True:
+            frame = source.read()
+            if frame is None:
+                break
+            captured_at = time.perf_counter()
+            frame = cv2.resize(frame, PREVIEW_SIZE)
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            ui.put((Image.fromarray(frame), captured_at))
+        ui.put(None)
+
+    wall, cpu = time.perf_counter(), time.process_time()
+    threading.Thread(target=camera_loop, daemon=True).start()
+    while (item := ui.get()) is not None:
+        img, captured_at = item
+        paint(img)
+        latencies.append(time.perf_counter() - captured_at)
+    return summary(wall, cpu, latencies)
+
+
+def new_preview(video: str) -> dict:
+    wake = threading.Event()
+    pipeline = PreviewPipeline(VideoFileSource(video), notify=wake.set)
+    latencies = []
+    wall, cpu = time.perf_counter(), time.process_time()
+    pipeline.start()
+    while True:
+        wake.wait()
+        wake.clear()
+        latest = pipeline.take()
+        if latest is None:
+            if pipeline.finished:
+                break
+            continue
+        buffer, captured_at = latest
+        paint(Image.frombuffer("RGB", PREVIEW_SIZE, buffer, "raw", "RGB", 0, 1))
+        pipeline.release(buffer)
+        latencies.append(time.perf_counter() - captured_at)
+    pipeline.stop()
+    return summary(wall, cpu, latencies)
+
+
+def summary(wall: float, cpu: float, latencies: list[float]) -> dict:
+    elapsed = time.perf_counter() - wall
+    latencies = sorted(latencies)
+    return {"cpu": 100 * (time.process_time() - cpu) / elapsed, "fps": len(latencies) / elapsed,
+            "latency": 1000 * sum(latencies) / len(latencies), "p95": 1000 * latencies[int(len(latencies) * 0.95)]}
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        video = make_video(os.path.join(tmp, "camera.avi"), SECONDS)
+        print(f"{SECONDS:.0f}s of {VIDEO_SIZE[0]}x{VIDEO_SIZE[1]} at {VIDEO_FPS} fps, preview cap {PREVIEW_FPS} fps\n")
+        print(f"{'':24s} {'CPU':>6s} {'preview':>10s} {'latency':>9s} {'p95':>8s}")
+        for name, run in (("old: every frame", old_preview), ("new: capped pipeline", new_preview)):
+            result = run(video)
+            print(f"{name:24s} {result['cpu']:5.1f}% {result['fps']:6.1f} fps {result['latency']:6.1f} ms "
+                  f"{result['p95']:5.1f} ms")
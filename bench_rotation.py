@@ -0,0 +1,33 @@
+import os
+import sys
+import time
+from PIL import Image
+from PageOCR_module import ROTATION_STRATEGIES, mean_confidence, ocr_image
+from bench_ocr import collect_pages
+
+# --- Benchmark: per-page cost of each rotation strategy ---
+# Usage: python bench_rotation.py [library_dir]
+LIBRARY_DIR = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.getcwd(), "Book")
+
+
+if __name__ == "__main__":
+    pages = collect_pages(LIBRARY_DIR)
+    print(f"{len(pages)} pages from {LIBRARY_DIR}\n")
+
+    baseline = None
+    for rotation in ROTATION_STRATEGIES:
+        total_time, total_words, confs = 0.0, 0, []
+        for img_path in pages:
+            img = Image.open(img_path)
+            img.load()  # keep JPEG decoding out of the timing
+            start = time.perf_counter()
+            ocr_data = ocr_image(img, rotation)
+            total_time += time.perf_counter() - start
+            conf, words = mean_confidence(ocr_data)
+            total_words += words
+            confs.append(conf)
+
+        per_page = total_time / len(pages)
+        baseline = baseline or per_page
+        print(f"{rotation:10s} {per_page:6.2f}s/page  saving {100 * (1 - per_page / baseline):5.1f}%  "
+              f"{total_words:5d} words  mean conf {sum(confs) / len(confs):5.1f}")
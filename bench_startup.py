@@ -0,0 +1,40 @@
+import os
+import re
+import subprocess
+import sys
+
+# --- Benchmark: import cost of the translator GUI vs its background pipeline ---
+# Runs python -X importtime and lists the slowest top-level imports.
+# Usage: python bench_startup.py [top_n]
+TOP_N = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+MODULES = ["Image2Words_GUI", "BookPipeline_module"]
+
+
+def import_times(module: str) -> tuple[float, list[tuple[float, str]]]:
+    """Return the module's cumulative import time and its direct imports, slowest first."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, cwd=os.getcwd())
+    children = []
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package", nested imports
+        # are indented two spaces per level and listed before their parent
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|( +)(\S+)", line)
+        if not match:
+            continue
+        seconds, level, name = int(match.group(1)) / 1e6, (len(match.group(2)) - 1) // 2, match.group(3)
+        if level == 1:
+            children.append((seconds, name))
+        elif level == 0:
+            if name == module:
+                return seconds, sorted(children, reverse=True)
+            children = []
+    return 0.0, []
+
+
+if __name__ == "__main__":
+    for module in MODULES:
+        total, times = import_times(module)
+        print(f"import {module}: {total:.2f}s")
+        for seconds, name in times[:TOP_N]:
+            print(f"  {seconds:6.3f}s  {name}")
+        print()
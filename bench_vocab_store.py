@@ -0,0 +1,83 @@
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from wordfreq import top_n_list
+from VocabStore_module import VocabStore
+
+# --- Benchmark: page insert throughput as the library grows ---
+# Old: one unindexed table per book, SELECT 1 + INSERT per word.
+# New: shared indexed schema, executemany upserts per page.
+# Then: how many of each new book's lemmas the shared entries already define.
+# Usage: python bench_vocab_store.py [books]
+BOOKS = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+PAGES_PER_BOOK = 300
+WORDS_PER_PAGE = 60
+
+
+def book_pages(rng: random.Random, vocab: list[str]) -> list[dict[str, str]]:
+    return [{w: f"definition of {w}" for w in rng.sample(vocab, WORDS_PER_PAGE)} for _ in range(PAGES_PER_BOOK)]
+
+
+def insert_old(conn: sqlite3.Connection, book_name: str, pages: list[dict[str, str]]):
+    table_name = f"word_definitions_{book_name}"
+    cursor = conn.cursor()
+    cursor.execute(f'''CREATE TABLE IF NOT EXISTS {table_name}
+                    (word TEXT, definition TEXT, page_number INTEGER, book_name TEXT)''')
+    for page_number, word_defs in enumerate(pages, 1):
+        for word, definition in word_defs.items():
+            cursor.execute(f'SELECT 1 FROM {table_name} WHERE word=? AND book_name=? AND page_number=?',
+                           (word, book_name, page_number))
+            if cursor.fetchone() is None:
+                cursor.execute(f'INSERT INTO {table_name}(word, definition, page_number, book_name) VALUES(?,?,?,?)',
+                               (word, definition, page_number, book_name))
+        conn.commit()
+
+
+def insert_new(store: VocabStore, book_name: str, pages: list[dict[str, str]]):
+    book_id = store.book_id(book_name)
+    for page_number, word_defs in enumerate(pages, 1):
+        store.add_definitions(store.page_id(book_id, page_number), word_defs)
+        store.commit()
+
+
+def book_lemmas(rng: random.Random, vocab: list[str], weights: list[float]) -> set[str]:
+    """Unique lemmas of a Zipf-distributed book, minus the 500 most frequent (never translated)."""
+    tokens = rng.choices(range(len(vocab)), weights=weights, k=PAGES_PER_BOOK * 250)
+    return {vocab[rank] for rank in tokens if rank >= 500}
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    vocab = top_n_list("da", 20000)
+    library = [book_pages(rng, vocab) for _ in range(BOOKS)]
+    print(f"{BOOKS} books x {PAGES_PER_BOOK} pages x {WORDS_PER_PAGE} words\n")
+    print(f"{'book':>4s} {'old pages/s':>12s} {'new pages/s':>12s}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        old_conn = sqlite3.connect(os.path.join(tmp, "old.db"))
+        store = VocabStore(os.path.join(tmp, "new.db"))
+        for i, pages in enumerate(library, 1):
+            start = time.perf_counter()
+            insert_old(old_conn, f"book{i}", pages)
+            old = PAGES_PER_BOOK / (time.perf_counter() - start)
+            start = time.perf_counter()
+            insert_new(store, f"book{i}", pages)
+            new = PAGES_PER_BOOK / (time.perf_counter() - start)
+            print(f"{i:4d} {old:12.0f} {new:12.0f}")
+        old_conn.close()
+        store.close()
+
+        # Shared entries: share of each book's lemmas some earlier book already translated
+        print(f"\n{'book':>4s} {'lemmas':>7s} {'store hits':>11s}")
+        weights = [1 / (rank + 1) for rank in range(len(vocab))]
+        store = VocabStore(os.path.join(tmp, "library.db"))
+        for i in range(1, BOOKS + 2):
+            lemmas = book_lemmas(rng, vocab, weights)
+            known = store.definitions(lemmas)
+            store.add_entries({lemma: f"definition of {lemma}" for lemma in lemmas if lemma not in known})
+            store.commit()
+            print(f"{i:4d} {len(lemmas):7d} {100 * len(known) / len(lemmas):10.1f}%")
+        store.close()
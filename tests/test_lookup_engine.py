@@ -0,0 +1,132 @@
+import json
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import DanishDictionary_module as dictionary
+from LookupEngine_module import LookupEngine
+from TranslationCache_module import TranslationCache
+
+# Per-request latency of the stub, long enough for requests to overlap
+STUB_DELAY = 0.05
+
+
+# --- Stub of the MediaWiki extracts API ---
+class StubWiktionary(BaseHTTPRequestHandler):
+    """
+    Answers like da.wiktionary.org. Titles starting with "flaky" fail with a
+    503 the first two times, "missing" always gets a 404. Records every
+    request's title and arrival time, and the peak number in flight.
+    """
+
+    lock = threading.Lock()
+
+    def do_GET(self):
+        server = self.server
+        title = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)["titles"][0]
+        with self.lock:
+            server.requests.append((title, time.monotonic()))
+            attempt = sum(1 for t, _ in server.requests if t == title)
+            server.in_flight += 1
+            server.peak = max(server.peak, server.in_flight)
+        time.sleep(STUB_DELAY)
+        with self.lock:
+            server.in_flight -= 1
+
+        if title.startswith("missing"):
+            status = 404
+        elif title.startswith("flaky") and attempt <= 2:
+            status = 503
+        else:
+            status = 200
+        body = json.dumps({"query": {"pages": {"1": {"title": title, "extract": f"{title}: stub"}}}})
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubWiktionary)
+    server.requests, server.in_flight, server.peak = [], 0, 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/w/api.php"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def engine(monkeypatch, tmp_path):
+    """The module's retry policy with short backoff, and an empty cache."""
+    engine = LookupEngine(max_in_flight=4, rate=None, backoff=0.01, should_retry=dictionary._is_transient)
+    monkeypatch.setattr(dictionary, "engine", engine)
+    monkeypatch.setattr(dictionary, "cache", TranslationCache(str(tmp_path / "cache.db")))
+    return engine
+
+
+def titles(stub) -> list[str]:
+    return [title for title, _ in stub.requests]
+
+
+# --- Retries ---
+def test_retries_503_until_it_succeeds(stub, engine):
+    assert engine.call(dictionary.fetch_danish_definition, "flaky", stub.url) == "flaky: stub"
+    assert titles(stub) == ["flaky"] * 3
+    assert engine.stats() == {"calls": 3, "retried": 2, "failed": 0}
+
+
+def test_does_not_retry_404(stub, engine):
+    with pytest.raises(requests.HTTPError):
+        engine.call(dictionary.fetch_danish_definition, "missing", stub.url)
+    assert titles(stub) == ["missing"]
+    assert engine.stats() == {"calls": 1, "retried": 0, "failed": 1}
+
+
+def test_get_danish_definitions(stub, engine):
+    words = ["hus", "flaky1", "missing1", "bil", "hus"]
+    result = dictionary.get_danish_definitions(words, url=stub.url)
+
+    assert result == {"hus": "hus: stub", "flaky1": "flaky1: stub", "missing1": None, "bil": "bil: stub"}
+    assert sorted(titles(stub)) == sorted(["hus", "bil", "missing1"] + ["flaky1"] * 3)
+    # Found entries are cached; a failed request is not
+    stub.requests.clear()
+    assert dictionary.get_danish_definitions(words, url=stub.url) == result
+    assert titles(stub) == ["missing1"]
+
+
+# --- Concurrency and rate ---
+def test_in_flight_cap(stub, engine):
+    words = [f"ord{i}" for i in range(24)]
+    result = dictionary.get_danish_definitions(words, url=stub.url)
+
+    assert result == {w: f"{w}: stub" for w in words}
+    # Requests overlapped, but never more than the cap
+    assert 1 < stub.peak <= engine.max_in_flight
+
+
+def test_rate_limit(stub, monkeypatch, tmp_path):
+    rate, burst = 20.0, 2
+    # Taken before the bucket exists: scheduling delays can only make requests
+    # later than the limiter allows, never earlier, so the bound below is exact
+    start = time.monotonic()
+    engine = LookupEngine(max_in_flight=8, rate=rate, burst=burst, should_retry=dictionary._is_transient)
+    monkeypatch.setattr(dictionary, "engine", engine)
+    monkeypatch.setattr(dictionary, "cache", TranslationCache(str(tmp_path / "cache.db")))
+
+    words = [f"ord{i}" for i in range(12)]
+    dictionary.get_danish_definitions(words, url=stub.url)
+
+    # After the initial burst, the i-th request waits for its token
+    times = sorted(t for _, t in stub.requests)
+    assert len(times) == len(words)
+    for i in range(burst, len(times)):
+        assert times[i] - start >= (i - burst + 1) / rate